@@ -0,0 +1,326 @@
+"""
+Async serving mode for the voter-facing routes.
+
+The ballot page and vote POST (/vote_with_token/<token>) are served by
+async views on an async SQLAlchemy engine, so one process can keep many
+voters waiting on the database at once. Live results streams are async
+too, so watchers don't tie up threads. Every other route is the regular
+Flask app, mounted underneath and run on a thread pool. Run with an ASGI
+server, e.g.
+
+    uvicorn asgi:app --workers 4
+    gunicorn -k uvicorn.workers.UvicornWorker -w 4 asgi:app
+
+The async views use the same models, templates, session cookie, shared
+state, idempotency store and rollups as routes.py.
+"""
+import asyncio
+import os
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime
+from urllib.parse import parse_qs
+
+from a2wsgi import WSGIMiddleware
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from starlette.applications import Starlette
+from starlette.exceptions import HTTPException
+from starlette.responses import HTMLResponse, RedirectResponse, StreamingResponse
+from starlette.routing import Mount, Route
+
+from app import create_app
+from ballots import ballot_cache_key, ballot_namespaces, ballot_payload, candidates_query, chosen_candidate_id
+from db_pool import async_engine_options, register_engine
+from idempotency import vote_results
+from live_results import notifier
+from models import Election, Vote, Voter
+from rollups import rollup_statements
+from shared_state import shared_state
+from slow_queries import slow_query_log
+from tokens import active_token_query
+
+flask_app = create_app()
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_uri(uri):
+    """Swap the sync driver in a database URI for its asyncio counterpart."""
+    scheme, rest = uri.split("://", 1)
+    dialect = scheme.split("+", 1)[0]
+    return f"{ASYNC_DRIVERS.get(dialect, scheme)}://{rest}"
+
+
+engine = create_async_engine(
+    async_database_uri(flask_app.config["SQLALCHEMY_DATABASE_URI"]),
+    **async_engine_options(flask_app.config)
+)
+Session = async_sessionmaker(engine, expire_on_commit=False)
+# Same slow query log and /ops/pool metrics as the Flask engine
+slow_query_log.watch(engine.sync_engine)
+register_engine("async", engine.sync_engine)
+
+templates = Environment(
+    loader=FileSystemLoader(os.path.join(flask_app.root_path, flask_app.template_folder)),
+    autoescape=select_autoescape(["html"])
+)
+url_adapter = flask_app.url_map.bind("")
+
+
+def url_for(endpoint, **values):
+    return url_adapter.build(endpoint, values)
+
+
+templates.globals["url_for"] = url_for
+
+
+# -------------------
+# Flash messages via the Flask session cookie
+# -------------------
+class FlashSession:
+    """
+    Reads and writes flashed messages in the same signed cookie Flask uses,
+    so a message flashed here shows up on the Flask-rendered page the voter
+    is redirected to, and vice versa.
+    """
+
+    def __init__(self, request):
+        interface = flask_app.session_interface
+        self.serializer = interface.get_signing_serializer(flask_app)
+        self.cookie_name = flask_app.config["SESSION_COOKIE_NAME"]
+        self.data = {}
+        self.modified = False
+        raw = request.cookies.get(self.cookie_name)
+        if raw:
+            try:
+                self.data = self.serializer.loads(
+                    raw, max_age=int(flask_app.permanent_session_lifetime.total_seconds())
+                )
+            except Exception:
+                self.data = {}
+
+    @property
+    def user_id(self):
+        """The Flask-Login user of this session, if any."""
+        user_id = self.data.get("_user_id")
+        return int(user_id) if user_id else None
+
+    def flash(self, message, category):
+        self.data.setdefault("_flashes", []).append((category, message))
+        self.modified = True
+
+    def get_flashed_messages(self, with_categories=False):
+        flashes = self.data.pop("_flashes", [])
+        if flashes:
+            self.modified = True
+        return list(flashes) if with_categories else [message for _, message in flashes]
+
+    def apply(self, response):
+        if self.modified:
+            interface = flask_app.session_interface
+            response.set_cookie(
+                self.cookie_name,
+                self.serializer.dumps(self.data),
+                path=interface.get_cookie_path(flask_app),
+                domain=interface.get_cookie_domain(flask_app),
+                secure=interface.get_cookie_secure(flask_app),
+                httponly=interface.get_cookie_httponly(flask_app),
+                samesite=interface.get_cookie_samesite(flask_app),
+            )
+        return response
+
+
+def redirect(flashes, location):
+    return flashes.apply(RedirectResponse(location, status_code=302))
+
+
+def render_ballot(flashes, election, token, candidates):
+    html = templates.get_template("vote_with_token.html").render(
+        election=election,
+        token=token,
+        candidates=candidates,
+        idempotency_key=uuid.uuid4().hex,
+        get_flashed_messages=flashes.get_flashed_messages
+    )
+    return flashes.apply(HTMLResponse(html))
+
+
+# -------------------
+# Data access
+# -------------------
+# Shared state and the idempotency store take file locks and do file I/O,
+# so they run on the thread pool rather than blocking the event loop.
+async def find_active_token(session, link_token):
+    stmt = active_token_query(link_token, flask_app.config["TOKEN_STORAGE"] == "binary")
+    if stmt is None:
+        return None
+    return (await session.execute(stmt)).scalars().first()
+
+
+async def get_ballot(session, election_id):
+    key = ballot_cache_key(election_id)
+    generation, hit, payload = await asyncio.to_thread(shared_state.lookup, key)
+    if not hit:
+        election = await session.get(Election, election_id)
+        candidates = (await session.execute(candidates_query(election_id))).scalars().all() if election else []
+        payload = ballot_payload(election, candidates)
+        await asyncio.to_thread(shared_state.store, key, generation, payload)
+    return payload
+
+
+# -------------------
+# Views
+# -------------------
+async def vote_with_token(request):
+    token = request.path_params["token"]
+    flashes = FlashSession(request)
+
+    if request.method == "POST":
+        form = {k: v[0] for k, v in parse_qs((await request.body()).decode()).items()}
+        idempotency_key = form.get("idempotency_key", "")
+
+        # ✅ Repeat submission of the same form: replay the original outcome
+        outcome = await asyncio.to_thread(vote_results.claim, token, idempotency_key)
+        if outcome is not None:
+            flashes.flash(outcome["message"], outcome["category"])
+            return redirect(flashes, outcome["location"] or url_for("main.index"))
+
+        try:
+            return await cast_vote(flashes, token, form, idempotency_key)
+        except Exception:
+            await asyncio.to_thread(vote_results.release, token, idempotency_key)
+            raise
+
+    async with Session() as session:
+        token_record = await find_active_token(session, token)
+        if not token_record:
+            flashes.flash("❌ Invalid or expired voting link.", "danger")
+            return redirect(flashes, url_for("main.index"))
+        payload = await get_ballot(session, token_record.election_id)
+
+    if payload is None:
+        return HTMLResponse("Not Found", status_code=404)
+    election, candidates = ballot_namespaces(payload)
+    return render_ballot(flashes, election, token, candidates)
+
+
+async def cast_vote(flashes, token, form, idempotency_key):
+    ballot_url = url_for("main.vote_with_token", token=token)
+
+    async def reject(message, category, election=None, candidates=None):
+        flashes.flash(message, category)
+        await asyncio.to_thread(
+            vote_results.store, token, idempotency_key, category, message, ballot_url if election else None
+        )
+        if election is None:
+            return redirect(flashes, url_for("main.index"))
+        return render_ballot(flashes, election, token, candidates)
+
+    async with Session() as session:
+        # Find the token record
+        token_record = await find_active_token(session, token)
+        if not token_record:
+            return await reject("❌ Invalid or expired voting link.", "danger")
+
+        payload = await get_ballot(session, token_record.election_id)
+        if payload is None:
+            return HTMLResponse("Not Found", status_code=404)
+        election, candidates = ballot_namespaces(payload)
+
+        email = form.get("email", "").lower()
+        passcode = form.get("passcode", "")
+
+        # ✅ Check passcode
+        if passcode != election.passcode:
+            return await reject("❌ Invalid election passcode.", "danger", election, candidates)
+
+        # ✅ Check if email matches the assigned voter
+        voter_id = (await session.execute(
+            select(Voter.id).where(Voter.email == email, Voter.election_id == election.id).limit(1)
+        )).scalar()
+        if not voter_id:
+            return await reject("❌ This email is not registered for this election.", "danger", election, candidates)
+
+        # ✅ Check if this voter has already voted (duplicate protection)
+        existing_vote = (await session.execute(
+            select(Vote.id).where(Vote.voter_id == voter_id, Vote.election_id == election.id).limit(1)
+        )).scalar()
+        if existing_vote:
+            return await reject("⚠️ You have already voted in this election.", "warning", election, candidates)
+
+        # ✅ Only a candidate on this election's ballot; anything else is a
+        # 400, as in routes.py
+        candidate_id = chosen_candidate_id(form.get("candidate"), candidates)
+        if candidate_id is None:
+            raise HTTPException(status_code=400)
+
+        # ✅ Save vote
+        voted_at = datetime.utcnow()
+        session.add(Vote(
+            voter_id=voter_id,
+            candidate_id=candidate_id,
+            election_id=election.id,
+            timestamp=voted_at
+        ))
+        token_record.is_used = True  # Mark token as used
+        for stmt, fallback_insert in rollup_statements(election.id, voted_at, engine.dialect.name):
+            result = await session.execute(stmt)
+            if fallback_insert is not None and result.rowcount == 0:
+                await session.execute(fallback_insert)
+        await session.commit()
+
+    await asyncio.to_thread(shared_state.invalidate, f"results:{election.id}")
+    notifier.notify(election.id)
+
+    message = "✅ Your vote has been recorded successfully!"
+    await asyncio.to_thread(vote_results.store, token, idempotency_key, "success", message, url_for("main.index"))
+    flashes.flash(message, "success")
+    return redirect(flashes, url_for("main.index"))
+
+
+async def results_stream(request):
+    """
+    Live results for a coordinator's manage page, streamed from the event
+    loop: an open page costs no thread, unlike on a sync worker.
+    """
+    election_id = request.path_params["election_id"]
+    flashes = FlashSession(request)
+    if flashes.user_id is None:
+        return RedirectResponse(url_for("main.login"), status_code=302)
+
+    async with Session() as session:
+        coordinator_id = (await session.execute(
+            select(Election.coordinator_id).where(Election.id == election_id)
+        )).scalar()
+    if coordinator_id is None:
+        return HTMLResponse("Not Found", status_code=404)
+    if coordinator_id != flashes.user_id:
+        return HTMLResponse("Forbidden", status_code=403)
+
+    return StreamingResponse(
+        notifier.astream(election_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    await engine.dispose()
+
+
+app = Starlette(
+    routes=[
+        Route("/vote_with_token/{token}", vote_with_token, methods=["GET", "POST"]),
+        Route("/election/{election_id:int}/results/stream", results_stream),
+        Mount("/", app=WSGIMiddleware(flask_app)),
+    ],
+    lifespan=lifespan,
+)
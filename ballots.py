@@ -0,0 +1,66 @@
+from types import SimpleNamespace
+
+from sqlalchemy import select
+
+from extensions import db
+from models import Election, Candidate
+from shared_state import shared_state
+
+
+def ballot_cache_key(election_id):
+    return f"election:{election_id}"
+
+
+def candidates_query(election_id):
+    return select(Candidate).where(Candidate.election_id == election_id).order_by(Candidate.id)
+
+
+def ballot_payload(election, candidates):
+    """What the ballot page needs, as plain JSON-friendly data for the shared cache."""
+    if election is None:
+        return None
+    return {
+        "election": {
+            "id": election.id,
+            "title": election.title,
+            "description": election.description,
+            "passcode": election.passcode,
+        },
+        "candidates": [
+            {"id": c.id, "name": c.name, "position": c.position}
+            for c in candidates
+        ],
+    }
+
+
+def ballot_namespaces(payload):
+    """(election, candidates) objects that templates and views can use like models."""
+    return (
+        SimpleNamespace(**payload["election"]),
+        [SimpleNamespace(**c) for c in payload["candidates"]]
+    )
+
+
+def chosen_candidate_id(value, candidates):
+    """The submitted candidate id if it is on this ballot, else None (missing, malformed or forged)."""
+    try:
+        candidate_id = int(value)
+    except (TypeError, ValueError):
+        return None
+    return candidate_id if any(c.id == candidate_id for c in candidates) else None
+
+
+def load_ballot(election_id):
+    election = db.session.get(Election, election_id)
+    if election is None:
+        return None
+    return ballot_payload(election, db.session.execute(candidates_query(election_id)).scalars())
+
+
+def get_ballot(election_id):
+    """Ballot payload for an election, shared across workers; None if it doesn't exist."""
+    return shared_state.cached(ballot_cache_key(election_id), lambda: load_ballot(election_id))
+
+
+def invalidate_ballot(election_id):
+    shared_state.invalidate(ballot_cache_key(election_id))
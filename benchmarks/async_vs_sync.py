@@ -0,0 +1,139 @@
+"""
+Concurrency per process: sync Flask (gunicorn) versus async mode (asgi.py).
+
+1. Seed a shared database and save the voting tokens it prints:
+
+     SQLALCHEMY_DATABASE_URI=postgresql://... \\
+         python benchmarks/async_vs_sync.py seed --voters 5000 > tokens.txt
+
+2. Start ONE process of each server against that database:
+
+     gunicorn -w 1 -b 127.0.0.1:8001 "app:create_app()"
+     uvicorn asgi:app --workers 1 --port 8002
+
+3. Drive both at the same concurrency levels:
+
+     python benchmarks/async_vs_sync.py run --tokens tokens.txt \\
+         --concurrency 10 50 200 http://127.0.0.1:8001 http://127.0.0.1:8002
+
+GET requests load the ballot page and can be repeated; --mode post casts
+one vote per token, so seed enough voters for every server and level.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from urllib.parse import urlencode, urlsplit
+
+
+# -------------------
+# Seeding
+# -------------------
+def seed(args):
+    from common import make_app, seed_election
+    from extensions import db
+
+    app = make_app(os.environ["SQLALCHEMY_DATABASE_URI"])
+    with app.app_context():
+        election, tokens = seed_election(n_voters=args.voters)
+        candidate_id = election.candidates[0].id
+        for i, token in enumerate(tokens):
+            print(token, f"voter{i}@example.com", candidate_id, election.passcode)
+        db.session.remove()
+
+
+# -------------------
+# Load generation
+# -------------------
+async def request(host, port, method, path, body=b""):
+    reader, writer = await asyncio.open_connection(host, port)
+    headers = [f"{method} {path} HTTP/1.1", f"Host: {host}", "Connection: close"]
+    if method == "POST":
+        headers += ["Content-Type: application/x-www-form-urlencoded", f"Content-Length: {len(body)}"]
+    writer.write(("\r\n".join(headers) + "\r\n\r\n").encode() + body)
+    await writer.drain()
+    status_line = await reader.readline()
+    await reader.read()  # drain the response
+    writer.close()
+    return int(status_line.split()[1])
+
+
+async def drive(base_url, mode, tokens, concurrency, duration):
+    parts = urlsplit(base_url)
+    host, port = parts.hostname, parts.port or 80
+    queue = list(tokens)
+    latencies, errors = [], 0
+    deadline = time.monotonic() + duration
+
+    async def worker(offset):
+        nonlocal errors
+        i = offset
+        while time.monotonic() < deadline:
+            if mode == "post":
+                if not queue:
+                    return
+                token, email, candidate_id, passcode = queue.pop()
+                body = urlencode({"email": email, "passcode": passcode, "candidate": candidate_id}).encode()
+                call = request(host, port, "POST", f"/vote_with_token/{token}", body)
+            else:
+                token = tokens[i % len(tokens)][0]
+                i += concurrency
+                call = request(host, port, "GET", f"/vote_with_token/{token}")
+            start = time.perf_counter()
+            try:
+                status = await call
+            except OSError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+            if status >= 400:
+                errors += 1
+
+    start = time.monotonic()
+    await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    elapsed = time.monotonic() - start
+    return len(latencies) / elapsed, latencies, errors
+
+
+def run(args):
+    with open(args.tokens) as f:
+        tokens = [line.split() for line in f if line.strip()]
+
+    print(f"{'server':<28} {'conc':>5} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+    for url in args.urls:
+        for concurrency in args.concurrency:
+            rate, latencies, errors = asyncio.run(drive(url, args.mode, tokens, concurrency, args.duration))
+            if args.mode == "post":
+                tokens = tokens[len(latencies) + errors:]
+            if latencies:
+                p50 = statistics.median(latencies) * 1000
+                p95 = statistics.quantiles(latencies, n=20)[-1] * 1000 if len(latencies) > 1 else p50
+            else:
+                p50 = p95 = float("nan")
+            print(f"{url:<28} {concurrency:>5} {rate:>9.1f} {p50:>8.1f} {p95:>8.1f} {errors:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = sub.add_parser("seed", help="create an election and print its tokens")
+    seed_parser.add_argument("--voters", type=int, default=5000)
+
+    run_parser = sub.add_parser("run", help="load the servers")
+    run_parser.add_argument("urls", nargs="+")
+    run_parser.add_argument("--tokens", required=True)
+    run_parser.add_argument("--mode", choices=("get", "post"), default="get")
+    run_parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 200])
+    run_parser.add_argument("--duration", type=float, default=10.0, help="seconds per level")
+
+    args = parser.parse_args()
+    if args.command == "seed":
+        seed(args)
+    else:
+        run(args)
+
+
+if __name__ == "__main__":
+    main()
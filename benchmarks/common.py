@@ -0,0 +1,75 @@
+"""Shared helpers for the benchmarks: an app on a scratch database and seed data."""
+import os
+import sys
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sqlalchemy import event  # noqa: E402
+
+from app import create_app  # noqa: E402
+from extensions import db  # noqa: E402
+from models import User, Election, Candidate, Voter  # noqa: E402
+from tokens import issue_token  # noqa: E402
+
+
+def make_app(database_uri=None, **overrides):
+    """A testing-profile app with its tables created. Defaults to in-memory SQLite."""
+    if database_uri:
+        overrides["SQLALCHEMY_DATABASE_URI"] = database_uri
+    app = create_app("testing", overrides)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def seed_election(n_candidates=5, n_voters=100, passcode="bench"):
+    """Insert a coordinator and one open election. Returns (election, tokens)."""
+    coordinator = User(email=f"coordinator-{uuid.uuid4().hex[:8]}@example.com", role="coordinator")
+    coordinator.set_password("bench")
+    db.session.add(coordinator)
+    db.session.flush()
+
+    now = datetime.utcnow()
+    election = Election(
+        title="Benchmark Election",
+        start_time=now - timedelta(hours=1),
+        end_time=now + timedelta(days=1),
+        coordinator_id=coordinator.id,
+        passcode=passcode
+    )
+    db.session.add(election)
+    db.session.flush()
+
+    db.session.add_all(
+        Candidate(name=f"Candidate {i}", position="Chair", election_id=election.id)
+        for i in range(n_candidates)
+    )
+    voters = [
+        Voter(email=f"voter{i}@example.com", election_id=election.id)
+        for i in range(n_voters)
+    ]
+    db.session.add_all(voters)
+    db.session.flush()
+
+    tokens = [issue_token(voter, election)[1] for voter in voters]
+    db.session.commit()
+    return election, tokens
+
+
+@contextmanager
+def count_statements(engine):
+    """Count SQL statements executed on `engine` inside the block."""
+    counter = {"statements": 0}
+
+    def before_cursor_execute(*args):
+        counter["statements"] += 1
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
@@ -0,0 +1,109 @@
+"""
+Election creation latency: the old per-row flow versus one batched transaction.
+
+The old flow is what the create_election view did before: commit the
+election, commit the candidates, then for every voter commit the voter and
+commit its token. The batched flow is elections.create_election. Emails
+are left out of both, so only the database work is timed. On SQLite the
+batched flow still sends one INSERT per candidate and voter (RETURNING
+order can't be guaranteed for multi-row INSERTs there), so run against
+Postgres to see the multi-row INSERT ... RETURNING path.
+
+    python benchmarks/create_election.py --candidates 50 --voters 10000
+    python benchmarks/create_election.py --database-uri postgresql://... --runs 3
+"""
+import argparse
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from common import make_app, count_statements
+from elections import create_election
+from extensions import db
+from models import User, Election, Candidate, Voter
+from tokens import issue_token
+
+
+def legacy_create(coordinator_id, form):
+    """The pre-batching create_election view, minus the emails."""
+    new_election = Election(
+        title=form["title"],
+        description=form["description"],
+        start_time=form["start_time"],
+        end_time=form["end_time"],
+        coordinator_id=coordinator_id,
+        is_active=True,
+        passcode=form["passcode"]
+    )
+    db.session.add(new_election)
+    db.session.commit()
+
+    for candidate in form["candidates"]:
+        db.session.add(Candidate(name=candidate["name"], position=candidate["position"], election_id=new_election.id))
+    db.session.commit()
+
+    for voter in form["voters"]:
+        new_voter = Voter(email=voter["email"], phone=voter["phone"], election_id=new_election.id)
+        db.session.add(new_voter)
+        db.session.commit()
+
+        issue_token(new_voter, new_election)
+        db.session.commit()
+
+
+def batched_create(coordinator_id, form):
+    create_election(coordinator_id, **form)
+
+
+def make_form(n_candidates, n_voters):
+    now = datetime.utcnow()
+    return {
+        "title": "Benchmark Election",
+        "description": "",
+        "passcode": "bench",
+        "start_time": now,
+        "end_time": now + timedelta(days=1),
+        "candidates": [{"name": f"Candidate {i}", "position": "Chair"} for i in range(n_candidates)],
+        "voters": [{"email": f"voter{i}@example.com", "phone": ""} for i in range(n_voters)],
+    }
+
+
+def run(app, flow, form, runs):
+    timings, statements = [], 0
+    with app.app_context():
+        coordinator = User(email=f"coordinator-{uuid.uuid4().hex[:8]}@example.com", role="coordinator")
+        coordinator.set_password("bench")
+        db.session.add(coordinator)
+        db.session.commit()
+        coordinator_id = coordinator.id
+
+        for _ in range(runs):
+            with count_statements(db.engine) as counter:
+                started = time.perf_counter()
+                flow(coordinator_id, form)
+                timings.append(time.perf_counter() - started)
+            statements = counter["statements"]
+            db.session.remove()
+    return timings, statements
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, default=50)
+    parser.add_argument("--voters", type=int, default=10000)
+    parser.add_argument("--runs", type=int, default=1)
+    parser.add_argument("--database-uri", help="default: in-memory SQLite")
+    args = parser.parse_args()
+
+    form = make_form(args.candidates, args.voters)
+    print(f"{args.candidates} candidates, {args.voters} voters, {args.runs} run(s)")
+    for name, flow in (("per-row commits", legacy_create), ("batched", batched_create)):
+        app = make_app(args.database_uri)
+        timings, statements = run(app, flow, form, args.runs)
+        print(f"  {name:<16} median {statistics.median(timings):8.2f} s   "
+              f"{statements:>6} statements per election")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Duplicate ballot submissions with and without idempotency keys.
+
+Simulates a voter whose browser sends the same vote POST several times
+and reports the SQL statements executed and the responses returned:
+
+    python benchmarks/duplicate_votes.py --voters 200 --repeats 3
+"""
+import argparse
+from collections import Counter
+
+from common import make_app, seed_election, count_statements
+from extensions import db
+
+
+def run(app, voters, repeats, with_keys):
+    with app.app_context():
+        election, tokens = seed_election(n_voters=voters)
+        candidate_id = election.candidates[0].id
+        engine = db.engine
+
+    client = app.test_client()
+    outcomes = Counter()
+    with count_statements(engine) as counter:
+        for i, token in enumerate(tokens):
+            form = {
+                "email": f"voter{i}@example.com",
+                "passcode": "bench",
+                "candidate": candidate_id,
+                "idempotency_key": f"key-{i}" if with_keys else "",
+            }
+            for _ in range(repeats):
+                response = client.post(f"/vote_with_token/{token}", data=form)
+                with client.session_transaction() as session:
+                    flashes = session.pop("_flashes", [])
+                outcomes[(response.status_code, flashes[-1][1] if flashes else "")] += 1
+    return counter["statements"], outcomes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--voters", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=3, help="submissions per voter")
+    args = parser.parse_args()
+
+    for with_keys in (False, True):
+        app = make_app()
+        statements, outcomes = run(app, args.voters, args.repeats, with_keys)
+        label = "with idempotency keys" if with_keys else "without keys"
+        print(f"\n== {label} ==")
+        print(f"SQL statements: {statements} ({statements / (args.voters * args.repeats):.1f} per POST)")
+        for (status, message), n in outcomes.most_common():
+            print(f"  {n:>6} x {status} {message}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Cold-start benchmark for the web app and the CLI tools.
+
+Each target is started in a fresh interpreter several times and the wall
+clock time is reported, so the numbers include every import done at
+startup. Run from the repository root:
+
+    python benchmarks/import_time.py --runs 10
+    python benchmarks/import_time.py --importtime app   # slowest imports
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = {
+    # What a gunicorn worker does before serving its first request
+    "app": "from app import create_app; create_app()",
+    # Schema inspection CLI
+    "check_db": "import check_db",
+    # `flask --app app ...` CLI commands
+    "flask-cli": "from flask.cli import ScriptInfo; ScriptInfo(app_import_path='app').load_app()",
+}
+
+
+def run_once(code, extra_args=()):
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, *extra_args, "-c", code],
+        cwd=ROOT, capture_output=True, text=True,
+        env={**os.environ, "BALLOTBOX_CONFIG": os.getenv("BALLOTBOX_CONFIG", "testing")},
+    )
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise SystemExit(f"Target failed:\n{result.stderr}")
+    return elapsed, result.stderr
+
+
+def show_importtime(name, top):
+    _, stderr = run_once(TARGETS[name], ("-X", "importtime"))
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|", 2)
+        rows.append((int(cumulative_us), int(self_us), module.rstrip()))
+    rows.sort(reverse=True)
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for cumulative, self_time, module in rows[:top]:
+        print(f"{cumulative / 1000:>14.1f} {self_time / 1000:>9.1f}  {module}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("targets", nargs="*", default=list(TARGETS), choices=list(TARGETS))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--importtime", action="store_true", help="show the slowest imports instead")
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args()
+
+    if args.importtime:
+        for name in args.targets:
+            print(f"\n== {name} ==")
+            show_importtime(name, args.top)
+        return
+
+    print(f"{'target':<12} {'min ms':>9} {'median ms':>10} {'max ms':>9}")
+    for name in args.targets:
+        timings = [run_once(TARGETS[name])[0] * 1000 for _ in range(args.runs)]
+        print(f"{name:<12} {min(timings):>9.1f} {statistics.median(timings):>10.1f} {max(timings):>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Connection pool stress test: no starvation at the target concurrency.
+
+Runs --threads threads (default: gunicorn.conf.py's GUNICORN_THREADS) in one
+process, each repeatedly checking out a connection through the app's
+session, loading a ballot and holding the connection for --hold-ms to stand
+in for the rest of the request. Passes when no checkout hits DB_POOL_TIMEOUT
+and the worst wait stays under --max-wait-ms.
+
+    python benchmarks/pool_stress.py --database-uri postgresql://... --profile production
+    python benchmarks/pool_stress.py --database-uri postgresql://... --threads 40 --pool-size 10 --max-overflow 5
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+from sqlalchemy import exc, select, text
+
+from common import make_app, seed_election
+from config import get_config
+from db_pool import pool_metrics
+from extensions import db
+from models import Candidate, Election
+
+
+def worker(app, election_id, iterations, hold, latencies, errors, start):
+    start.wait()
+    for _ in range(iterations):
+        began = time.perf_counter()
+        with app.app_context():
+            try:
+                db.session.get(Election, election_id)
+                db.session.execute(select(Candidate).where(Candidate.election_id == election_id)).all()
+                if db.engine.dialect.name == "postgresql":
+                    db.session.execute(text("SELECT pg_sleep(:s)"), {"s": hold})
+                else:
+                    time.sleep(hold)
+            except exc.TimeoutError:
+                errors.append("timeout")
+            finally:
+                db.session.remove()
+        latencies.append(time.perf_counter() - began)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-uri", default=os.getenv("SQLALCHEMY_DATABASE_URI"),
+                        help="a server database; SQLite does not use the pool settings")
+    parser.add_argument("--profile", default="production", help="config profile whose DB_POOL_* to use")
+    parser.add_argument("--threads", type=int, default=int(os.getenv("GUNICORN_THREADS", 8)))
+    parser.add_argument("--iterations", type=int, default=200, help="requests per thread")
+    parser.add_argument("--hold-ms", type=float, default=5, help="time each request keeps its connection")
+    parser.add_argument("--max-wait-ms", type=float, default=100, help="worst acceptable checkout wait")
+    parser.add_argument("--pool-size", type=int)
+    parser.add_argument("--max-overflow", type=int)
+    parser.add_argument("--pool-timeout", type=float)
+    args = parser.parse_args()
+
+    if not args.database_uri or args.database_uri.startswith("sqlite"):
+        parser.error("--database-uri must point at a server database")
+
+    profile = get_config(args.profile)
+    overrides = {
+        "DB_POOL_SIZE": args.pool_size if args.pool_size is not None else profile.DB_POOL_SIZE,
+        "DB_MAX_OVERFLOW": args.max_overflow if args.max_overflow is not None else profile.DB_MAX_OVERFLOW,
+        "DB_POOL_TIMEOUT": args.pool_timeout if args.pool_timeout is not None else profile.DB_POOL_TIMEOUT,
+        "DB_POOL_RECYCLE": profile.DB_POOL_RECYCLE,
+        "DB_POOL_PRE_PING": profile.DB_POOL_PRE_PING,
+    }
+    app = make_app(args.database_uri, **overrides)
+    with app.app_context():
+        election, _ = seed_election(n_candidates=10, n_voters=0)
+        election_id = election.id
+        db.session.remove()
+        db.engine.pool.reset_stats()
+
+    latencies, errors = [], []
+    start = threading.Event()
+    threads = [
+        threading.Thread(target=worker, args=(app, election_id, args.iterations, args.hold_ms / 1000,
+                                              latencies, errors, start))
+        for _ in range(args.threads)
+    ]
+    for t in threads:
+        t.start()
+    began = time.perf_counter()
+    start.set()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - began
+
+    with app.app_context():
+        pool = pool_metrics()["engines"]["default"]
+
+    latencies.sort()
+    print(f"pool_size={overrides['DB_POOL_SIZE']} max_overflow={overrides['DB_MAX_OVERFLOW']} "
+          f"pool_timeout={overrides['DB_POOL_TIMEOUT']}s threads={args.threads}")
+    print(f"  requests:          {len(latencies)} in {elapsed:.2f}s ({len(latencies) / elapsed:.0f}/s)")
+    print(f"  request p50 / p99: {statistics.median(latencies) * 1000:.1f} / "
+          f"{latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f} ms")
+    print(f"  peak checked out:  {pool['peak_checked_out']}")
+    print(f"  checkout wait:     avg {pool['wait_avg_ms']} ms, max {pool['wait_max_ms']} ms")
+    print(f"  timeouts:          {pool['timeouts']}")
+
+    starved = pool["timeouts"] or errors or pool["wait_max_ms"] > args.max_wait_ms
+    print("FAIL: connection starvation" if starved else "OK: no connection starvation")
+    sys.exit(1 if starved else 0)
+
+
+if __name__ == "__main__":
+    main()
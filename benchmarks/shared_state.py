@@ -0,0 +1,69 @@
+"""
+Shared state backends versus the database.
+
+Times the ballot metadata lookup done by every vote_with_token request
+(election plus candidates) straight from the database and through each
+shared state backend, then times the results invalidation every vote
+does (a generation bump).
+Pass --database-uri to measure against Postgres instead of SQLite:
+
+    python benchmarks/shared_state.py --iterations 5000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from common import make_app, seed_election
+from extensions import db
+from shared_state import SharedState, InProcessState, MmapState
+from ballots import load_ballot
+
+
+def timed(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = time.perf_counter() - start
+    return elapsed / iterations * 1e6  # microseconds per call
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--candidates", type=int, default=20)
+    parser.add_argument("--database-uri")
+    args = parser.parse_args()
+
+    app = make_app(args.database_uri)
+    with app.app_context():
+        election, _ = seed_election(n_candidates=args.candidates, n_voters=1)
+        election_id = election.id
+
+        def from_db():
+            load_ballot(election_id)
+            db.session.expire_all()
+
+        backends = {"in-process": InProcessState()}
+        with tempfile.TemporaryDirectory() as tmp:
+            backends["mmap"] = MmapState(os.path.join(tmp, "state.bin"))
+
+            print(f"{'ballot metadata lookup':<28} {'us/call':>10}")
+            print(f"{'database':<28} {timed(from_db, args.iterations):>10.1f}")
+            for name, backend in backends.items():
+                state = SharedState()
+                state.backend = backend
+                key = f"election:{election_id}"
+
+                def cached():
+                    state.cached(key, lambda: load_ballot(election_id))
+
+                print(f"{name:<28} {timed(cached, args.iterations):>10.1f}")
+
+            print(f"\n{'results invalidation':<28} {'us/call':>10}")
+            for name, backend in backends.items():
+                print(f"{name:<28} {timed(lambda: backend.incr(f'gen:results:{election_id}'), args.iterations):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Size of the token table and its unique index, text versus 16-byte tokens.
+
+Builds one SQLite database per representation with the same number of
+rows and reports table and index sizes (from the dbstat virtual table when
+SQLite was built with it, otherwise the file size), plus lookup time by
+token. For Postgres, run the printed query against a real database
+before and after `flask compact-tokens --drop-strings`.
+
+    python benchmarks/token_storage.py --rows 200000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+import uuid
+
+POSTGRES_QUERY = """
+SELECT relname, pg_size_pretty(pg_relation_size(oid)) AS size
+FROM pg_class
+WHERE relname IN ('token', 'token_token_key', 'uq_token_token_bin', 'ix_token_expires_at');
+"""
+
+SCHEMAS = {
+    "text (36 chars)": (
+        "CREATE TABLE token (id INTEGER PRIMARY KEY, token VARCHAR(36) UNIQUE, "
+        "election_id INTEGER, voter_id INTEGER, is_used BOOLEAN, created_at DATETIME, expires_at DATETIME)",
+        lambda u: str(u),
+        "token",
+    ),
+    "binary (16 bytes)": (
+        "CREATE TABLE token (id INTEGER PRIMARY KEY, token_bin BLOB UNIQUE, "
+        "election_id INTEGER, voter_id INTEGER, is_used BOOLEAN, created_at DATETIME, expires_at DATETIME)",
+        lambda u: u.bytes,
+        "token_bin",
+    ),
+}
+
+
+def build(path, schema, encode, column, values):
+    conn = sqlite3.connect(path)
+    conn.execute(schema)
+    conn.executemany(
+        f"INSERT INTO token ({column}, election_id, voter_id, is_used, created_at, expires_at) "
+        "VALUES (?, 1, ?, 0, '2026-01-01 00:00:00', '2026-01-02 00:00:00')",
+        ((encode(u), i) for i, u in enumerate(values))
+    )
+    conn.commit()
+    conn.execute("VACUUM")
+    return conn
+
+
+def sizes(conn, path):
+    try:
+        rows = conn.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name").fetchall()
+        return {name: size for name, size in rows}
+    except sqlite3.OperationalError:
+        return {"(file)": os.path.getsize(path)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--lookups", type=int, default=20000)
+    args = parser.parse_args()
+
+    values = [uuid.uuid4() for _ in range(args.rows)]
+    probes = random.sample(values, min(args.lookups, len(values)))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, (schema, encode, column) in SCHEMAS.items():
+            path = os.path.join(tmp, f"{column}.db")
+            conn = build(path, schema, encode, column, values)
+
+            start = time.perf_counter()
+            for u in probes:
+                conn.execute(f"SELECT id FROM token WHERE {column} = ?", (encode(u),)).fetchone()
+            per_lookup = (time.perf_counter() - start) / len(probes) * 1e6
+
+            print(f"\n== {label}, {args.rows} rows ==")
+            for name, size in sorted(sizes(conn, path).items()):
+                print(f"  {name:<32} {size / 1024:>10.0f} KiB")
+            print(f"  lookup by token: {per_lookup:.1f} us")
+            conn.close()
+
+    print("\nOn Postgres, measure the live table with:" + POSTGRES_QUERY)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,43 @@
-from app import app, db
-from sqlalchemy import inspect
+"""
+Database doctor.
 
-with app.app_context():
-    inspector = inspect(db.engine)
+    python check_db.py                  # tables and columns
+    python check_db.py sizes            # row counts, table and index sizes
+    python check_db.py indexes          # foreign keys in models.py without an index
+    python check_db.py slow-queries     # summary of the slow query log
+    python check_db.py all
+"""
+import argparse
+import json
+import os
+import statistics
+from collections import defaultdict
+
+from sqlalchemy import create_engine, inspect, text
+
+from config import get_config
+
+DEFAULT_SLOW_QUERY_LOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "instance", "slow_queries.jsonl")
+
+# Plan lines that mean a whole table is read
+FULL_SCAN_MARKERS = ("Seq Scan on", "SCAN ")
+
+
+def human_size(n):
+    if n is None:
+        return "n/a"
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if n < 1024:
+            return f"{n:.0f} {unit}"
+        n /= 1024
+    return f"{n:.1f} TiB"
+
+
+# -------------------
+# Reports
+# -------------------
+def report_schema(engine):
+    inspector = inspect(engine)
     tables = inspector.get_table_names()
     print("Tables:", tables)
 
@@ -11,3 +46,130 @@ with app.app_context():
         columns = inspector.get_columns(table)
         for col in columns:
             print(f" - {col['name']} ({col['type']})")
+
+
+def table_sizes(conn, table):
+    """(table bytes, index bytes) where the database can tell us, else (None, None)."""
+    if conn.dialect.name == "postgresql":
+        row = conn.execute(
+            text("SELECT pg_table_size(CAST(:t AS regclass)), pg_indexes_size(CAST(:t AS regclass))"),
+            {"t": f'"{table}"'}
+        ).one()
+        return row[0], row[1]
+    if conn.dialect.name == "sqlite":
+        try:
+            rows = conn.execute(
+                text("SELECT name, SUM(pgsize) FROM dbstat WHERE name = :t OR name IN "
+                     "(SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :t) GROUP BY name"),
+                {"t": table}
+            ).all()
+        except Exception:
+            return None, None  # SQLite built without the dbstat table
+        table_bytes = sum(size for name, size in rows if name == table)
+        return table_bytes, sum(size for name, size in rows if name != table)
+    return None, None
+
+
+def report_sizes(engine):
+    inspector = inspect(engine)
+    print(f"{'table':<20} {'rows':>12} {'table':>12} {'indexes':>12}")
+    with engine.connect() as conn:
+        for table in inspector.get_table_names():
+            rows = conn.execute(text(f'SELECT COUNT(*) FROM "{table}"')).scalar()
+            table_bytes, index_bytes = table_sizes(conn, table)
+            print(f"{table:<20} {rows:>12} {human_size(table_bytes):>12} {human_size(index_bytes):>12}")
+
+
+def unindexed_foreign_keys(engine):
+    """Foreign-key columns declared in models.py with no index starting with them in the database."""
+    from extensions import db
+    import models  # noqa: F401  (registers the tables on db.metadata)
+
+    inspector = inspect(engine)
+    existing = set(inspector.get_table_names())
+    missing = []
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing:
+            continue
+        leading = {tuple(inspector.get_pk_constraint(table.name).get("constrained_columns") or ())[:1]}
+        leading |= {tuple(ix["column_names"][:1]) for ix in inspector.get_indexes(table.name)}
+        leading |= {tuple(uc["column_names"][:1]) for uc in inspector.get_unique_constraints(table.name)}
+        for column in table.columns:
+            if column.foreign_keys and (column.name,) not in leading:
+                target = next(iter(column.foreign_keys)).target_fullname
+                missing.append((table.name, column.name, target))
+    return missing
+
+
+def report_indexes(engine):
+    missing = unindexed_foreign_keys(engine)
+    if not missing:
+        print("Every foreign key column has an index.")
+        return
+    print("Foreign key columns without an index (joins and deletes on them scan the table):")
+    for table, column, target in missing:
+        print(f" - {table}.{column} -> {target}")
+        print(f"     CREATE INDEX ix_{table}_{column} ON \"{table}\" ({column});")
+
+
+def report_slow_queries(path, top):
+    if not os.path.exists(path):
+        print(f"No slow query log at {path}. Set SLOW_QUERY_THRESHOLD_MS and let the app run.")
+        return
+
+    groups = defaultdict(lambda: {"durations": [], "sql": None, "params": None, "plan": None})
+    with open(path) as f:
+        for line in f:
+            record = json.loads(line)
+            group = groups[record["fingerprint"]]
+            group["durations"].append(record["duration_ms"])
+            group["sql"] = record["sql"]
+            group["params"] = record["params"]
+            group["plan"] = record["plan"] or group["plan"]
+
+    ranked = sorted(groups.items(), key=lambda item: sum(item[1]["durations"]), reverse=True)
+    for key, group in ranked[:top]:
+        durations = group["durations"]
+        plan = group["plan"] or []
+        full_scans = [line.strip() for line in plan if any(marker in line for marker in FULL_SCAN_MARKERS)]
+        print(f"\n[{key}] {len(durations)} calls, total {sum(durations):.0f} ms, "
+              f"median {statistics.median(durations):.1f} ms, max {max(durations):.1f} ms")
+        print(f"  {group['sql']}")
+        print(f"  params: {json.dumps(group['params'])}")
+        for line in full_scans:
+            print(f"  FULL SCAN: {line}")
+        if plan and not full_scans:
+            print(f"  plan: {plan[0].strip()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("report", nargs="?", default="schema",
+                        choices=("schema", "sizes", "indexes", "slow-queries", "all"))
+    parser.add_argument("--database-uri", help="default: SQLALCHEMY_DATABASE_URI of the active config")
+    parser.add_argument("--slow-query-log", help=f"default: SLOW_QUERY_LOG or {DEFAULT_SLOW_QUERY_LOG}")
+    parser.add_argument("--top", type=int, default=20, help="slow query shapes to show")
+    args = parser.parse_args()
+
+    config = get_config()
+    slow_query_log = args.slow_query_log or config.SLOW_QUERY_LOG or DEFAULT_SLOW_QUERY_LOG
+
+    # Only the engine is needed to inspect the database, so skip building
+    # the Flask app (and importing every view) altogether.
+    engine = create_engine(args.database_uri or config.SQLALCHEMY_DATABASE_URI)
+
+    reports = {
+        "schema": lambda: report_schema(engine),
+        "sizes": lambda: report_sizes(engine),
+        "indexes": lambda: report_indexes(engine),
+        "slow-queries": lambda: report_slow_queries(slow_query_log, args.top),
+    }
+    for name, report in reports.items():
+        if args.report in (name, "all"):
+            if args.report == "all":
+                print(f"\n===== {name} =====")
+            report()
+
+
+if __name__ == '__main__':
+    main()
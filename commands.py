@@ -0,0 +1,119 @@
+import time
+
+import click
+from flask import current_app
+
+from extensions import db
+from models import Election
+
+
+# -------------------
+# CLI Commands
+# -------------------
+@click.command("send-reminders")
+@click.argument("election_id", type=int)
+@click.option("--rate", type=float, help="Emails per second (default: REMINDER_RATE_PER_SECOND).")
+@click.option("--chunk-size", type=int, help="Voters fetched per query (default: REMINDER_CHUNK_SIZE).")
+@click.option("--base-url", help="Public site URL for voting links (default: BASE_URL).")
+def send_reminders_command(election_id, rate, chunk_size, base_url):
+    """Re-send voting links to voters of ELECTION_ID who have not voted."""
+    from reminders import start_campaign, claim_stale_campaign, run_campaign
+
+    election = db.session.get(Election, election_id)
+    if election is None:
+        raise click.ClickException(f"Election {election_id} not found.")
+
+    campaign, created = start_campaign(election)
+    if created:
+        click.echo(f"Campaign {campaign.id}: {campaign.total} voters have not voted.")
+    elif not claim_stale_campaign(campaign):
+        # Its worker is still sending; running it here too would email voters twice
+        raise click.ClickException(f"Campaign {campaign.id} is already running")
+    else:
+        click.echo(f"Resuming campaign {campaign.id} after voter {campaign.last_voter_id}.")
+
+    def report(c):
+        click.echo(f"  {c.status}: {c.sent} sent, {c.failed} failed of {c.total}")
+
+    run_campaign(
+        campaign.id,
+        base_url or current_app.config["BASE_URL"],
+        rate=rate,
+        chunk_size=chunk_size,
+        on_progress=report
+    )
+
+
+@click.command("backfill-rollups")
+@click.option("--election-id", type=int, help="Only rebuild this election (default: all).")
+def backfill_rollups_command(election_id):
+    """Rebuild per-minute and per-hour turnout rollups from existing votes."""
+    from rollups import backfill_election
+
+    if election_id is not None:
+        election_ids = [election_id]
+    else:
+        election_ids = [row.id for row in db.session.query(Election.id).order_by(Election.id)]
+
+    for eid in election_ids:
+        total = backfill_election(eid)
+        click.echo(f"Election {eid}: {total} votes rolled up.")
+
+
+@click.command("purge-tokens")
+@click.option("--batch-size", type=int, help="Tokens removed per transaction (default: TOKEN_PURGE_BATCH_SIZE).")
+@click.option("--archive/--delete", default=True, help="Copy expired tokens to token_archive first (default) or just delete them.")
+@click.option("--interval", type=int, default=0, help="Keep running, purging every INTERVAL seconds.")
+def purge_tokens_command(batch_size, archive, interval):
+    """Remove voting tokens whose election ended (see TOKEN_PURGE_GRACE_DAYS)."""
+    from tokens import purge_expired_tokens
+
+    while True:
+        removed = purge_expired_tokens(batch_size=batch_size, archive=archive)
+        click.echo(f"{'Archived' if archive else 'Deleted'} {removed} expired tokens.")
+        if not interval:
+            break
+        db.session.remove()
+        time.sleep(interval)
+
+
+@click.command("compact-tokens")
+@click.option("--batch-size", type=int, help="Tokens converted per transaction (default: TOKEN_PURGE_BATCH_SIZE).")
+@click.option("--drop-strings", is_flag=True, help="Also clear the 36-char text column once token_bin is filled.")
+@click.option("--pause", type=float, default=0, help="Seconds to sleep between batches.")
+def compact_tokens_command(batch_size, drop_strings, pause):
+    """Convert existing tokens to the compact 16-byte representation."""
+    from tokens import compact_tokens
+
+    if drop_strings and current_app.config["TOKEN_STORAGE"] != "binary":
+        raise click.ClickException("Set TOKEN_STORAGE=binary before dropping the text tokens.")
+
+    converted, cleared = compact_tokens(batch_size=batch_size, drop_strings=drop_strings, pause=pause)
+    click.echo(f"Converted {converted} tokens; cleared {cleared} text tokens.")
+
+
+@click.command("rebuild-dashboard-stats")
+@click.option("--coordinator-id", type=int, help="Only rebuild this coordinator (default: all).")
+def rebuild_dashboard_stats_command(coordinator_id):
+    """Recount coordinators' dashboard summaries from their elections and voters."""
+    from models import User
+    from stats import rebuild
+
+    if coordinator_id is not None:
+        coordinator_ids = [coordinator_id]
+    else:
+        coordinator_ids = [row.id for row in db.session.query(User.id).filter_by(role="coordinator").order_by(User.id)]
+
+    for cid in coordinator_ids:
+        stats = rebuild(cid)
+        click.echo(f"Coordinator {cid}: {stats['active_elections']} active, {stats['closed_elections']} closed, "
+                   f"{stats['voters_invited']} voters, {stats['votes_cast']} votes, "
+                   f"{stats['email_failures']} email failures.")
+
+
+def register_commands(app):
+    app.cli.add_command(send_reminders_command)
+    app.cli.add_command(backfill_rollups_command)
+    app.cli.add_command(purge_tokens_command)
+    app.cli.add_command(compact_tokens_command)
+    app.cli.add_command(rebuild_dashboard_stats_command)
@@ -0,0 +1,121 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()  # Must be first
+
+
+# -------------------
+# Configuration Profiles
+# -------------------
+class Config:
+    SECRET_KEY = os.getenv("SECRET_KEY")
+    SQLALCHEMY_DATABASE_URI = os.getenv("SQLALCHEMY_DATABASE_URI")
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Connection pool of each worker (ignored for SQLite). Waiting longer
+    # than DB_POOL_TIMEOUT seconds for a connection fails the request;
+    # connections older than DB_POOL_RECYCLE seconds are replaced. Live
+    # numbers: GET /ops/pool with the X-Ops-Token header set to OPS_TOKEN.
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    OPS_TOKEN = os.getenv("OPS_TOKEN")  # unset: /ops/* returns 404
+
+    # Live results (Server-Sent Events)
+    LIVE_RESULTS_MAX_UPDATES_PER_SECOND = float(os.getenv("LIVE_RESULTS_MAX_UPDATES_PER_SECOND", 2))
+    LIVE_RESULTS_POLL_SECONDS = float(os.getenv("LIVE_RESULTS_POLL_SECONDS", 2))
+    LIVE_RESULTS_HEARTBEAT_SECONDS = float(os.getenv("LIVE_RESULTS_HEARTBEAT_SECONDS", 15))
+    # Streams per sync worker; each one holds a gthread thread (half of
+    # gunicorn.conf.py's 8 by default). Served by asgi.py, streams are
+    # not capped. Browsers over the cap get 503 and retry after:
+    LIVE_RESULTS_MAX_STREAMS = int(os.getenv("LIVE_RESULTS_MAX_STREAMS", 4))
+    LIVE_RESULTS_RETRY_SECONDS = int(os.getenv("LIVE_RESULTS_RETRY_SECONDS", 30))
+
+    # Election times are stored in UTC. The create form sends the browser's
+    # UTC conversion; without it (no JavaScript) the typed times are read
+    # in this IANA zone, as are elections stored before times were
+    # converted (migration f5a9c3d27b61).
+    ELECTION_TIMEZONE = os.getenv("ELECTION_TIMEZONE", "UTC")
+
+    # Public URL used to build voting links outside a request (CLI, background jobs)
+    BASE_URL = os.getenv("BASE_URL", "http://localhost:5000/")
+
+    # Reminder campaigns
+    REMINDER_RATE_PER_SECOND = float(os.getenv("REMINDER_RATE_PER_SECOND", 5))
+    REMINDER_CHUNK_SIZE = int(os.getenv("REMINDER_CHUNK_SIZE", 500))
+    # A campaign with no progress for this long lost its worker; the
+    # reminders button resumes it
+    REMINDER_STALE_SECONDS = int(os.getenv("REMINDER_STALE_SECONDS", 300))
+
+    # Idempotent vote submission: "filesystem" is shared by all workers on a
+    # host (defaults to <instance>/idempotency), "memory" is per process.
+    IDEMPOTENCY_STORE = os.getenv("IDEMPOTENCY_STORE", "filesystem")
+    IDEMPOTENCY_DIR = os.getenv("IDEMPOTENCY_DIR")
+    IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", 600))
+    IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", 5))
+
+    # Cross-worker counters and caches: "mmap" shares one file between all
+    # workers on a host (defaults to <instance>/shared_state.bin), "memory"
+    # is per process.
+    SHARED_STATE_BACKEND = os.getenv("SHARED_STATE_BACKEND", "memory")
+    SHARED_STATE_PATH = os.getenv("SHARED_STATE_PATH")
+    SHARED_STATE_COUNTER_SLOTS = int(os.getenv("SHARED_STATE_COUNTER_SLOTS", 65536))
+    SHARED_STATE_BLOB_SLOTS = int(os.getenv("SHARED_STATE_BLOB_SLOTS", 2048))
+    SHARED_STATE_BLOB_SLOT_SIZE = int(os.getenv("SHARED_STATE_BLOB_SLOT_SIZE", 4096))
+
+    # Voting tokens: "string" keeps the 36-char UUID, "binary" stores new
+    # tokens as 16 bytes (run `flask compact-tokens` to convert old ones).
+    TOKEN_STORAGE = os.getenv("TOKEN_STORAGE", "string")
+    TOKEN_PURGE_GRACE_DAYS = int(os.getenv("TOKEN_PURGE_GRACE_DAYS", 7))
+    TOKEN_PURGE_BATCH_SIZE = int(os.getenv("TOKEN_PURGE_BATCH_SIZE", 1000))
+
+    # Async serving mode (asgi.py): connection pool of the async engine
+    ASYNC_DB_POOL_SIZE = int(os.getenv("ASYNC_DB_POOL_SIZE", 20))
+    ASYNC_DB_MAX_OVERFLOW = int(os.getenv("ASYNC_DB_MAX_OVERFLOW", 10))
+
+    # Slow query log (0 disables); read it with `python check_db.py slow-queries`
+    SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 250))
+    SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG")  # default: <instance>/slow_queries.jsonl
+
+
+class DevelopmentConfig(Config):
+    DEBUG = True
+
+
+class ProductionConfig(Config):
+    DEBUG = False
+    SHARED_STATE_BACKEND = os.getenv("SHARED_STATE_BACKEND", "mmap")
+    # Sized for gunicorn.conf.py's gthread workers: one connection per
+    # thread, plus overflow for SSE streams and background campaigns.
+    # Fail fast rather than queue requests behind a saturated pool.
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 900))
+
+
+class TestingConfig(Config):
+    TESTING = True
+    SECRET_KEY = "testing"
+    SQLALCHEMY_DATABASE_URI = os.getenv("TEST_DATABASE_URI", "sqlite://")
+    IDEMPOTENCY_STORE = "memory"
+    SLOW_QUERY_THRESHOLD_MS = 0
+    DB_POOL_TIMEOUT = 5  # with TEST_DATABASE_URI: a leaked connection fails fast
+
+
+config_by_name = {
+    "development": DevelopmentConfig,
+    "production": ProductionConfig,
+    "testing": TestingConfig,
+}
+
+
+def get_config(name=None):
+    """Pick a profile by name, falling back to $BALLOTBOX_CONFIG, then production."""
+    name = name or os.getenv("BALLOTBOX_CONFIG", "production")
+    try:
+        return config_by_name[name]
+    except KeyError:
+        raise ValueError(f"Unknown config profile: {name!r}") from None
@@ -0,0 +1,123 @@
+import os
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from extensions import db
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that also records how long callers wait for a connection and
+    how often they give up (DB_POOL_TIMEOUT), alongside the usual
+    checked-out and overflow counts.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self.checkouts = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+            self.timeouts = 0
+            self.peak_checked_out = 0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        waited = time.perf_counter() - start
+        with self._stats_lock:
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+            self.peak_checked_out = max(self.peak_checked_out, self.checkedout())
+        return conn
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep the counters going
+        new_pool = super().recreate()
+        new_pool.checkouts, new_pool.wait_total = self.checkouts, self.wait_total
+        new_pool.wait_max, new_pool.timeouts = self.wait_max, self.timeouts
+        new_pool.peak_checked_out = self.peak_checked_out
+        return new_pool
+
+    def metrics(self):
+        with self._stats_lock:
+            return {
+                "pool_size": self.size(),
+                "checked_out": self.checkedout(),
+                "checked_in": self.checkedin(),
+                "overflow": self.overflow(),
+                "max_overflow": self._max_overflow,
+                "peak_checked_out": self.peak_checked_out,
+                "checkouts": self.checkouts,
+                "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+                "timeouts": self.timeouts,
+            }
+
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """The same counters for an asyncio engine (asgi.py)."""
+
+
+# Engines created outside Flask-SQLAlchemy, by name, for pool_metrics()
+_extra_engines = {}
+
+
+def register_engine(name, engine):
+    _extra_engines[name] = engine
+
+
+def engine_options(config):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS for the profile's DB_POOL_* settings. SQLite
+    keeps SQLAlchemy's defaults, since its pools don't take these options.
+    """
+    if (config.get("SQLALCHEMY_DATABASE_URI") or "").startswith("sqlite"):
+        return {}
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": config["DB_POOL_SIZE"],
+        "max_overflow": config["DB_MAX_OVERFLOW"],
+        "pool_timeout": config["DB_POOL_TIMEOUT"],
+        "pool_recycle": config["DB_POOL_RECYCLE"],
+        "pool_pre_ping": config["DB_POOL_PRE_PING"],
+    }
+
+
+def async_engine_options(config):
+    """create_async_engine options: ASYNC_DB_POOL_SIZE/ASYNC_DB_MAX_OVERFLOW, other DB_POOL_* shared."""
+    if (config.get("SQLALCHEMY_DATABASE_URI") or "").startswith("sqlite"):
+        return {}
+    return dict(
+        engine_options(config),
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=config["ASYNC_DB_POOL_SIZE"],
+        max_overflow=config["ASYNC_DB_MAX_OVERFLOW"],
+    )
+
+
+def pool_metrics():
+    """Pool metrics for every engine of the current app, and registered ones, in this process."""
+    engines = {name or "default": engine for name, engine in db.engines.items()}
+    engines.update(_extra_engines)
+    metrics = {"pid": os.getpid(), "engines": {}}
+    for name, engine in engines.items():
+        pool = engine.pool
+        if isinstance(pool, InstrumentedQueuePool):
+            metrics["engines"][name] = pool.metrics()
+        else:
+            metrics["engines"][name] = {"status": pool.status()}
+    return metrics
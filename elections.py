@@ -0,0 +1,151 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import insert
+
+from extensions import db
+from models import Election, Candidate, Voter, Token
+from email_service import get_gmail_service, send_voting_email
+from stats import bump, election_created
+from tokens import new_token_values
+
+
+def parse_datetime(value, tz=timezone.utc):
+    """
+    Form ('2026-10-19T09:00') or ISO 8601 timestamps, as naive UTC like
+    every other datetime in the database. Values with an offset ('Z',
+    '+01:00') are converted; values without one are read in `tz`.
+    """
+    if not isinstance(value, datetime):
+        try:
+            value = datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid date/time: {value!r}") from None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=tz)
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def create_election(coordinator_id, title, passcode, start_time, end_time, description=None,
+                    candidates=(), voters=(), tz=timezone.utc):
+    """
+    Create an election with its candidates, voter roster and tokens in one
+    transaction: either all of it is saved or none of it is.
+
+    `candidates` are {"name", "position"} dicts and `voters` {"email",
+    "phone"} dicts; blank entries are skipped and repeated emails kept
+    once. Candidates, voters and tokens are each sent as one executemany
+    instead of a round trip and a commit per row. On Postgres that becomes
+    multi-row INSERT ... RETURNING statements of up to 1000 rows; SQLite
+    can't guarantee RETURNING order for a multi-row INSERT, so there
+    SQLAlchemy issues one single-row INSERT per candidate and voter (still
+    in the one transaction).
+
+    Times without a UTC offset are read in `tz` and stored as UTC.
+
+    Raises ValueError for invalid input. Returns (election, candidate_ids,
+    invitations), invitations being (email, link_token) pairs to send once
+    the caller is happy the transaction committed.
+    """
+    if not str(title or "").strip() or not str(passcode or "").strip():
+        raise ValueError("Title and passcode are required.")
+    start_time, end_time = parse_datetime(start_time, tz), parse_datetime(end_time, tz)
+    if end_time <= start_time:
+        raise ValueError("The election must end after it starts.")
+
+    if not all(isinstance(entry, dict) for entry in (*candidates, *voters)):
+        raise ValueError("Candidates and voters must be objects.")
+
+    candidate_rows = [
+        {"name": str(c["name"]).strip(), "position": str(c.get("position") or "").strip()}
+        for c in candidates if str(c.get("name") or "").strip()
+    ]
+    voter_rows = {}
+    for v in voters:
+        email = str(v.get("email") or "").strip().lower()
+        if email and email not in voter_rows:
+            voter_rows[email] = {"email": email, "phone": v.get("phone") or None}
+
+    try:
+        election = Election(
+            title=title,
+            description=description,
+            start_time=start_time,
+            end_time=end_time,
+            coordinator_id=coordinator_id,
+            is_active=True,
+            passcode=passcode
+        )
+        db.session.add(election)
+        db.session.flush()
+
+        candidate_ids = []
+        if candidate_rows:
+            candidate_ids = db.session.scalars(
+                insert(Candidate).returning(Candidate.id, sort_by_parameter_order=True),
+                [dict(row, election_id=election.id) for row in candidate_rows]
+            ).all()
+
+        invitations = []
+        if voter_rows:
+            voter_ids = db.session.scalars(
+                insert(Voter).returning(Voter.id, sort_by_parameter_order=True),
+                [dict(row, election_id=election.id) for row in voter_rows.values()]
+            ).all()
+            token_rows = []
+            for voter_id, email in zip(voter_ids, voter_rows):
+                values, link_token = new_token_values(election)
+                token_rows.append(dict(values, voter_id=voter_id))
+                invitations.append((email, link_token))
+            db.session.execute(insert(Token), token_rows)
+
+        election_created(election, voters_invited=len(invitations))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return election, candidate_ids, invitations
+
+
+def send_invitations(election, invitations, base_url, on_result=None):
+    """
+    Email each (email, link_token) its voting link. `on_result(email,
+    success, error)` is called per voter. Failures are added to the
+    coordinator's dashboard stats; returns how many there were.
+    """
+    if not invitations:
+        return 0
+
+    # One Gmail client for the whole roster, as reminder campaigns do
+    try:
+        service, connect_error = get_gmail_service(), None
+    except Exception as e:
+        service, connect_error = None, e
+
+    failures = 0
+    for email, link_token in invitations:
+        error = connect_error
+        if service is None:
+            success = False
+        else:
+            try:
+                success = send_voting_email(
+                    recipient_email=email,
+                    voting_link=f"{base_url.rstrip('/')}/vote_with_token/{link_token}",
+                    election_title=election.title,
+                    passcode=election.passcode,
+                    start_time=election.start_time,
+                    end_time=election.end_time,
+                    service=service
+                )
+            except Exception as e:
+                success, error = False, e
+        if not success:
+            failures += 1
+        if on_result:
+            on_result(email, success, error)
+
+    if failures:
+        bump(election.coordinator_id, email_failures=failures)
+        db.session.commit()
+    return failures
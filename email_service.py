@@ -1,16 +1,19 @@
 import os
 import base64
 from email.mime.text import MIMEText
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
 
 # Gmail API scope: only sending emails
 SCOPES = ["https://www.googleapis.com/auth/gmail.send"]
 
 def get_gmail_service():
     """Authenticate and return Gmail API service."""
+    # The Google client libraries are slow to import, so they are loaded on
+    # first send rather than when the web app or a CLI tool starts up.
+    from google.auth.transport.requests import Request
+    from google.oauth2.credentials import Credentials
+    from google_auth_oauthlib.flow import InstalledAppFlow
+    from googleapiclient.discovery import build
+
     creds = None
 
     # token.json stores user access/refresh tokens
@@ -30,12 +33,24 @@ def get_gmail_service():
 
     return build("gmail", "v1", credentials=creds)
 
-def send_voting_email(recipient_email, voting_link, election_title, passcode, start_time, end_time):
+def _send_message(service, recipient_email, subject, body):
+    message = MIMEText(body)
+    message["to"] = recipient_email
+    message["subject"] = subject
+
+    raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode("utf-8")
+
+    service.users().messages().send(
+        userId="me", body={"raw": raw_message}
+    ).execute()
+
+def send_voting_email(recipient_email, voting_link, election_title, passcode, start_time, end_time, service=None):
     """
-    Send a voting invitation email using Gmail API.
+    Send a voting invitation email using Gmail API. Pass `service` to reuse
+    one Gmail client across a whole roster.
     """
     try:
-        service = get_gmail_service()
+        service = service or get_gmail_service()
 
         subject = f"Voting Invitation: {election_title}"
         body = f"""
@@ -45,8 +60,8 @@ def send_voting_email(recipient_email, voting_link, election_title, passcode, st
 
         Election Passcode: {passcode}
 
-        Voting starts: {start_time.strftime('%Y-%m-%d %H:%M')}
-        Voting ends:   {end_time.strftime('%Y-%m-%d %H:%M')}
+        Voting starts: {start_time.strftime('%Y-%m-%d %H:%M')} UTC
+        Voting ends:   {end_time.strftime('%Y-%m-%d %H:%M')} UTC
 
         Click the link below to cast your vote:
         {voting_link}
@@ -57,15 +72,7 @@ def send_voting_email(recipient_email, voting_link, election_title, passcode, st
         BallotBox Team
         """
 
-        message = MIMEText(body)
-        message["to"] = recipient_email
-        message["subject"] = subject
-
-        raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode("utf-8")
-
-        service.users().messages().send(
-            userId="me", body={"raw": raw_message}
-        ).execute()
+        _send_message(service, recipient_email, subject, body)
 
         print(f"✅ Email sent to {recipient_email}")
         return True
@@ -73,3 +80,37 @@ def send_voting_email(recipient_email, voting_link, election_title, passcode, st
     except Exception as e:
         print(f"❌ Email sending error: {str(e)}")
         return False
+
+def send_reminder_email(recipient_email, voting_link, election_title, passcode, end_time, service=None):
+    """
+    Remind a voter who has not voted yet. Pass `service` to reuse one Gmail
+    client across a whole campaign instead of re-authenticating per email.
+    """
+    try:
+        service = service or get_gmail_service()
+
+        subject = f"Reminder: Voting closes soon for {election_title}"
+        body = f"""
+        Hello,
+
+        We have not received your vote in the election: {election_title}.
+
+        Election Passcode: {passcode}
+
+        Voting ends: {end_time.strftime('%Y-%m-%d %H:%M')} UTC
+
+        Click the link below to cast your vote before it closes:
+        {voting_link}
+
+        Regards,  
+        BallotBox Team
+        """
+
+        _send_message(service, recipient_email, subject, body)
+
+        print(f"✅ Reminder sent to {recipient_email}")
+        return True
+
+    except Exception as e:
+        print(f"❌ Reminder sending error: {str(e)}")
+        return False
@@ -0,0 +1,23 @@
+import os
+
+# Load the app once in the master so workers fork with it already imported.
+preload_app = True
+
+workers = int(os.getenv("WEB_CONCURRENCY", 2))
+# Live results streams hold a connection open, so use threaded workers.
+# Each open stream also holds one of these threads, so a worker serves at
+# most LIVE_RESULTS_MAX_STREAMS of them; run asgi.py for many watchers.
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.getenv("GUNICORN_THREADS", 8))
+
+
+def post_fork(server, worker):
+    """Drop any DB connections inherited from the preloaded master."""
+    from extensions import db
+
+    app = server.app.wsgi()
+    with app.app_context():
+        for engine in db.engines.values():
+            # close=False leaves the parent's sockets alone; the child just
+            # forgets them and opens its own on first use.
+            engine.dispose(close=False)
@@ -0,0 +1,252 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+
+# Marker for a submission that is still being processed by another request
+PENDING = object()
+
+
+class MemoryResultStore:
+    """TTL-bounded results kept in this process. Fine for a single worker."""
+
+    def __init__(self, ttl_seconds):
+        self.ttl = ttl_seconds
+        self._lock = threading.Lock()
+        # key -> (expires_at, outcome or PENDING), oldest first. Every entry
+        # lives for the same TTL, so expiry order is insertion order and a
+        # purge only ever looks at the front.
+        self._items = OrderedDict()
+
+    def _purge(self, now):
+        while self._items:
+            key, (expires_at, _) = next(iter(self._items.items()))
+            if expires_at > now:
+                break
+            del self._items[key]
+
+    def reserve(self, key):
+        now = time.time()
+        with self._lock:
+            self._purge(now)
+            if key in self._items:
+                return False
+            self._items[key] = (now + self.ttl, PENDING)
+            return True
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None or item[0] <= time.time():
+                return None
+            return item[1]
+
+    def put(self, key, outcome):
+        with self._lock:
+            self._items[key] = (time.time() + self.ttl, outcome)
+            self._items.move_to_end(key)
+
+    def release(self, key):
+        with self._lock:
+            self._items.pop(key, None)
+
+
+class FileResultStore:
+    """
+    TTL-bounded results shared by every gunicorn worker on the host.
+
+    One small file per key: an empty file marks a submission in flight
+    (created with O_EXCL, so exactly one worker wins the race) and the
+    finished outcome is swapped in atomically with os.replace.
+
+    Files go in one subdirectory per TTL-long time bucket. A live key is
+    always in the current or the previous bucket, so older buckets are
+    dropped whole, by a background thread started when a new bucket
+    begins, instead of scanning files in a voter's request.
+    """
+
+    def __init__(self, directory, ttl_seconds):
+        self.directory = directory
+        self.ttl = ttl_seconds
+        self._lock = threading.Lock()
+        self._swept_bucket = None
+        self._sweeper = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _bucket(self, now):
+        return int(now // self.ttl)
+
+    def _path(self, key, bucket):
+        return os.path.join(self.directory, str(bucket), hashlib.sha256(key.encode()).hexdigest())
+
+    def _expired(self, path, now=None):
+        try:
+            return os.path.getmtime(path) + self.ttl <= (now or time.time())
+        except FileNotFoundError:
+            return True
+
+    def _find(self, key, now):
+        """Path of the key's file in the current or previous bucket, or None."""
+        bucket = self._bucket(now)
+        for b in (bucket, bucket - 1):
+            path = self._path(key, b)
+            if os.path.exists(path):
+                return path
+        return None
+
+    # -------------------
+    # Sweeping
+    # -------------------
+    def _maybe_sweep(self, bucket):
+        with self._lock:
+            if self._swept_bucket == bucket:
+                return
+            self._swept_bucket = bucket
+        self._sweeper = threading.Thread(
+            target=self.drop_old_buckets, args=(bucket,), name="idempotency-sweep", daemon=True
+        )
+        self._sweeper.start()
+
+    def drop_old_buckets(self, bucket):
+        """Remove every bucket older than the previous one (and files of the pre-bucket layout)."""
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.isfile(path):
+                    os.remove(path)
+                    continue
+                if name.isdigit() and int(name) < bucket - 1:
+                    # Rename first so only one worker deletes it and no one writes into it
+                    trash = f"{path}.trash-{os.getpid()}-{threading.get_ident()}"
+                    os.rename(path, trash)
+                    shutil.rmtree(trash, ignore_errors=True)
+                elif ".trash-" in name and os.path.getmtime(path) + 2 * self.ttl < time.time():
+                    shutil.rmtree(path, ignore_errors=True)  # left by a worker that died mid-sweep
+            except (FileNotFoundError, OSError):
+                continue  # another worker got there first
+
+    # -------------------
+    # Store interface
+    # -------------------
+    def reserve(self, key):
+        now = time.time()
+        bucket = self._bucket(now)
+        self._maybe_sweep(bucket)
+
+        previous = self._path(key, bucket - 1)
+        if os.path.exists(previous) and not self._expired(previous, now):
+            return False
+
+        path = self._path(key, bucket)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        for _ in range(2):
+            try:
+                os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600))
+                return True
+            except FileExistsError:
+                if not self._expired(path):
+                    return False
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+        return False
+
+    def get(self, key):
+        path = self._find(key, time.time())
+        if path is None or self._expired(path):
+            return None
+        try:
+            with open(path) as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        return json.loads(data) if data else PENDING
+
+    def put(self, key, outcome):
+        now = time.time()
+        path = self._find(key, now) or self._path(key, self._bucket(now))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(outcome, f)
+        os.replace(tmp, path)
+
+    def release(self, key):
+        bucket = self._bucket(time.time())
+        for b in (bucket, bucket - 1):
+            try:
+                os.remove(self._path(key, b))
+            except FileNotFoundError:
+                pass
+
+
+class VoteResultCache:
+    """
+    Remembers the outcome of each ballot submission by its idempotency key,
+    so a retried or double-clicked POST gets the original answer without
+    touching the database.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        ttl = app.config["IDEMPOTENCY_TTL_SECONDS"]
+        if app.config["IDEMPOTENCY_STORE"] == "memory":
+            self.backend = MemoryResultStore(ttl)
+        else:
+            directory = app.config["IDEMPOTENCY_DIR"] or os.path.join(app.instance_path, "idempotency")
+            self.backend = FileResultStore(directory, ttl)
+        self.wait_seconds = app.config["IDEMPOTENCY_WAIT_SECONDS"]
+        app.extensions["vote_results"] = self
+
+    @staticmethod
+    def _key(token, idempotency_key):
+        # Scope keys to the voting link so one ballot's key can't replay another's
+        return f"{token}:{idempotency_key}"
+
+    def claim(self, token, idempotency_key):
+        """
+        Return None if the caller should process this submission, or the
+        stored outcome of an earlier submission with the same key. If that
+        earlier submission is still running, wait briefly for it to finish.
+        """
+        if not idempotency_key:
+            return None
+        key = self._key(token, idempotency_key)
+        deadline = time.monotonic() + self.wait_seconds
+        while True:
+            if self.backend.reserve(key):
+                return None
+            outcome = self.backend.get(key)
+            if outcome is None:
+                continue  # expired or released in between; try to reserve again
+            if outcome is not PENDING:
+                return outcome
+            if time.monotonic() >= deadline:
+                return {
+                    "category": "info",
+                    "message": "⏳ Your vote is still being processed. Please wait a moment.",
+                    "location": None,
+                }
+            time.sleep(0.1)
+
+    def store(self, token, idempotency_key, category, message, location):
+        if idempotency_key:
+            self.backend.put(
+                self._key(token, idempotency_key),
+                {"category": category, "message": message, "location": location}
+            )
+
+    def release(self, token, idempotency_key):
+        if idempotency_key:
+            self.backend.release(self._key(token, idempotency_key))
+
+
+vote_results = VoteResultCache()
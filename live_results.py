@@ -0,0 +1,318 @@
+import asyncio
+import json
+import os
+import threading
+import time
+
+from sqlalchemy import func
+
+from extensions import db
+from models import Candidate, Vote, Voter
+from shared_state import shared_state
+
+
+class _Subscription:
+    """
+    One watching browser. Holds at most one pending update: deltas that
+    arrive before the stream picks them up are merged, so a slow client
+    never builds up a backlog.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._pending = None
+
+    def _merge(self, update):
+        if self._pending is None:
+            self._pending = {**update, "candidates": dict(update["candidates"])}
+        else:
+            self._pending["candidates"].update(update["candidates"])
+            for key, value in update.items():
+                if key != "candidates":
+                    self._pending[key] = value
+
+    def push(self, update):
+        with self._cond:
+            self._merge(update)
+            self._cond.notify()
+
+    def get(self, timeout):
+        with self._cond:
+            if self._pending is None:
+                self._cond.wait(timeout)
+            update, self._pending = self._pending, None
+            return update
+
+
+class _AsyncSubscription(_Subscription):
+    """
+    A watching browser served from an event loop (asgi.py). The notifier
+    thread wakes the loop instead of a thread blocking per browser.
+    """
+
+    def __init__(self, loop):
+        super().__init__()
+        self._loop = loop
+        self._event = asyncio.Event()
+
+    def push(self, update):
+        with self._cond:
+            self._merge(update)
+        try:
+            self._loop.call_soon_threadsafe(self._event.set)
+        except RuntimeError:  # loop already closed; the stream is gone
+            pass
+
+    async def aget(self, timeout):
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._event.clear()
+        with self._cond:
+            update, self._pending = self._pending, None
+            return update
+
+
+class _SyncStream:
+    """
+    Response body for one browser on a sync worker. Holds one of the
+    worker's LIVE_RESULTS_MAX_STREAMS slots until the server closes it.
+    """
+
+    def __init__(self, notifier, election_id):
+        self._notifier = notifier
+        self._election_id = election_id
+        self._released = False
+
+    def __iter__(self):
+        sub = self._notifier.subscribe(self._election_id)
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                yield self._notifier.format_event(sub.get(self._notifier.heartbeat_seconds))
+        finally:
+            self._notifier.unsubscribe(self._election_id, sub)
+
+    def close(self):
+        with self._notifier._lock:
+            if not self._released:
+                self._released = True
+                self._notifier._sync_streams -= 1
+
+
+class ResultsNotifier:
+    """
+    Fans out tally and turnout updates to every browser watching an election.
+
+    Tallies are computed once per election per tick by a single background
+    thread, no matter how many browsers are subscribed, and ticks are capped
+    at LIVE_RESULTS_MAX_UPDATES_PER_SECOND so bursts of votes are coalesced.
+    Votes cast in this worker wake the thread immediately; votes cast in
+    other gunicorn workers are picked up every LIVE_RESULTS_POLL_SECONDS.
+    With a shared state backend, that poll only re-reads elections whose
+    "results:<id>" generation moved; otherwise it re-reads every watched
+    election.
+
+    Each browser on a sync (gthread) worker ties up one of its threads for
+    as long as the page is open, so at most LIVE_RESULTS_MAX_STREAMS are
+    served per worker and the rest are told to retry later. asgi.py serves
+    the stream from the event loop instead (astream), where a watcher costs
+    no thread at all.
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._subscribers = {}   # election_id -> set of _Subscription
+        self._snapshots = {}     # election_id -> last full tally pushed
+        self._generations = {}   # election_id -> "results:<id>" generation at last publish
+        self._dirty = set()
+        self._sync_streams = 0
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+        self.app = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.min_interval = 1.0 / float(app.config.get("LIVE_RESULTS_MAX_UPDATES_PER_SECOND", 2))
+        self.poll_seconds = float(app.config.get("LIVE_RESULTS_POLL_SECONDS", 2))
+        self.heartbeat_seconds = float(app.config.get("LIVE_RESULTS_HEARTBEAT_SECONDS", 15))
+        self.max_streams = int(app.config.get("LIVE_RESULTS_MAX_STREAMS", 4))
+        app.extensions["results_notifier"] = self
+
+    # -------------------
+    # Producer side
+    # -------------------
+    def notify(self, election_id):
+        """Mark an election as changed. Cheap; safe to call after every vote."""
+        with self._lock:
+            if election_id not in self._subscribers:
+                return
+            self._dirty.add(election_id)
+        self._wakeup.set()
+
+    # -------------------
+    # Consumer side
+    # -------------------
+    def subscribe(self, election_id, sub=None):
+        sub = sub or _Subscription()
+        with self._lock:
+            self._subscribers.setdefault(election_id, set()).add(sub)
+            snapshot = self._snapshots.get(election_id)
+            if snapshot is None:
+                self._dirty.add(election_id)
+        if snapshot is not None:
+            sub.push(snapshot)
+        self._ensure_thread()
+        self._wakeup.set()
+        return sub
+
+    def unsubscribe(self, election_id, sub):
+        with self._lock:
+            subs = self._subscribers.get(election_id)
+            if subs is None:
+                return
+            subs.discard(sub)
+            if not subs:
+                del self._subscribers[election_id]
+                self._snapshots.pop(election_id, None)
+                self._generations.pop(election_id, None)
+                self._dirty.discard(election_id)
+
+    @staticmethod
+    def format_event(update):
+        if update is None:
+            return ": keep-alive\n\n"
+        return f"event: results\ndata: {json.dumps(update)}\n\n"
+
+    def open_stream(self, election_id):
+        """
+        Server-Sent Events body for one browser on a sync worker, or None
+        when this worker already serves LIVE_RESULTS_MAX_STREAMS of them.
+        """
+        with self._lock:
+            if self._sync_streams >= self.max_streams:
+                return None
+            self._sync_streams += 1
+        return _SyncStream(self, election_id)
+
+    async def astream(self, election_id):
+        """Async generator of Server-Sent Events for one browser."""
+        sub = self.subscribe(election_id, _AsyncSubscription(asyncio.get_running_loop()))
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                yield self.format_event(await sub.aget(self.heartbeat_seconds))
+        finally:
+            self.unsubscribe(election_id, sub)
+
+    # -------------------
+    # Background worker
+    # -------------------
+    def _ensure_thread(self):
+        # Threads do not survive fork, so a preloaded master's thread is
+        # never reused by a gunicorn worker.
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="results-notifier", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        last_poll = 0.0
+        while True:
+            self._wakeup.wait(self.poll_seconds)
+            self._wakeup.clear()
+
+            with self._lock:
+                watched = set(self._subscribers)
+                now = time.monotonic()
+                due = self._dirty & watched
+                self._dirty.clear()
+                poll = now - last_poll >= self.poll_seconds
+                if poll:
+                    last_poll = now
+
+            # Anything that fails here is retried by the next poll, since an
+            # election's generation only moves on once it is published.
+            try:
+                if poll:
+                    due |= {eid for eid in watched if self._changed_elsewhere(eid)}
+                if due:
+                    with self.app.app_context():
+                        for election_id in due:
+                            self._publish(election_id)
+                        db.session.remove()
+            except Exception as e:
+                print(f"❌ Live results error: {str(e)}")
+
+            # Coalesce: whatever arrives while we sleep goes out in one update
+            time.sleep(self.min_interval)
+
+    def _changed_elsewhere(self, election_id):
+        if not shared_state.is_shared:
+            return True
+        generation = shared_state.generation(f"results:{election_id}")
+        return generation is None or generation != self._generations.get(election_id)
+
+    def _publish(self, election_id):
+        # Read the generation first: a vote landing during the tally query
+        # leaves it behind and triggers another publish on the next poll.
+        generation = shared_state.generation(f"results:{election_id}")
+        tally = compute_tally(election_id)
+
+        with self._lock:
+            subs = list(self._subscribers.get(election_id, ()))
+            if not subs:
+                return
+            previous = self._snapshots.get(election_id)
+            self._snapshots[election_id] = tally
+            self._generations[election_id] = generation
+
+        if previous is None:
+            update = tally
+        else:
+            changed = {
+                cid: votes for cid, votes in tally["candidates"].items()
+                if previous["candidates"].get(cid) != votes
+            }
+            if not changed and tally["total_voters"] == previous["total_voters"]:
+                return
+            update = {**tally, "candidates": changed}
+
+        for sub in subs:
+            sub.push(update)
+
+
+def compute_tally(election_id):
+    """Per-candidate votes plus turnout for one election."""
+    rows = (
+        db.session.query(Candidate.id, func.count(Vote.id))
+        .outerjoin(Vote, Candidate.id == Vote.candidate_id)
+        .filter(Candidate.election_id == election_id)
+        .group_by(Candidate.id)
+        .all()
+    )
+    candidates = {str(cid): votes for cid, votes in rows}
+    total_votes = sum(candidates.values())
+
+    total_voters = (
+        db.session.query(func.count(Voter.id))
+        .filter(Voter.election_id == election_id)
+        .scalar()
+    )
+
+    return {
+        "election_id": election_id,
+        "candidates": candidates,
+        "total_votes": total_votes,
+        "total_voters": total_voters,
+        "turnout_percentage": round(total_votes / total_voters * 100, 2) if total_voters > 0 else 0,
+    }
+
+
+notifier = ResultsNotifier()
@@ -0,0 +1,31 @@
+"""Add vote_rollup table
+
+Revision ID: 5e8d0b6a41c2
+Revises: a3f1c9e2b7d4
+Create Date: 2026-10-19 11:40:03.227915
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e8d0b6a41c2'
+down_revision = 'a3f1c9e2b7d4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('vote_rollup',
+    sa.Column('election_id', sa.Integer(), nullable=False),
+    sa.Column('granularity', sa.String(length=6), nullable=False),
+    sa.Column('bucket', sa.DateTime(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['election_id'], ['election.id'], ),
+    sa.PrimaryKeyConstraint('election_id', 'granularity', 'bucket')
+    )
+
+
+def downgrade():
+    op.drop_table('vote_rollup')
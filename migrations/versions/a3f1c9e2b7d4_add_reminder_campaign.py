@@ -0,0 +1,41 @@
+"""Add reminder_campaign table
+
+Revision ID: a3f1c9e2b7d4
+Revises: d49c97a513b0
+Create Date: 2026-10-19 09:12:31.418205
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3f1c9e2b7d4'
+down_revision = 'd49c97a513b0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('reminder_campaign',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('election_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('sent', sa.Integer(), nullable=False),
+    sa.Column('failed', sa.Integer(), nullable=False),
+    sa.Column('last_voter_id', sa.Integer(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['election_id'], ['election.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('reminder_campaign', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_reminder_campaign_election_id'), ['election_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('reminder_campaign', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_reminder_campaign_election_id'))
+
+    op.drop_table('reminder_campaign')
@@ -0,0 +1,26 @@
+"""Add reminder_campaign.heartbeat_at
+
+Revision ID: b8c3f27e1d94
+Revises: e41d7a2c9f58
+Create Date: 2026-10-19 17:48:09.361520
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8c3f27e1d94'
+down_revision = 'e41d7a2c9f58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('reminder_campaign', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('reminder_campaign', schema=None) as batch_op:
+        batch_op.drop_column('heartbeat_at')
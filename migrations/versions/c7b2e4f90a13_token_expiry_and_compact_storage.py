@@ -0,0 +1,70 @@
+"""Token expiry, compact binary storage and token_archive
+
+Revision ID: c7b2e4f90a13
+Revises: 5e8d0b6a41c2
+Create Date: 2026-10-19 14:05:52.870144
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7b2e4f90a13'
+down_revision = '5e8d0b6a41c2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('token', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('token_bin', sa.LargeBinary(length=16), nullable=True))
+        batch_op.add_column(sa.Column('expires_at', sa.DateTime(), nullable=True))
+        batch_op.alter_column('token',
+               existing_type=sa.String(length=36),
+               nullable=True)
+        batch_op.create_unique_constraint('uq_token_token_bin', ['token_bin'])
+        batch_op.create_index(batch_op.f('ix_token_expires_at'), ['expires_at'], unique=False)
+
+    # Existing tokens expire with their election
+    op.execute(
+        "UPDATE token SET expires_at = "
+        "(SELECT election.end_time FROM election WHERE election.id = token.election_id)"
+    )
+
+    op.create_table('token_archive',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('election_id', sa.Integer(), nullable=False),
+    sa.Column('voter_id', sa.Integer(), nullable=False),
+    sa.Column('is_used', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('token_archive', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_token_archive_election_id'), ['election_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('token_archive', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_token_archive_election_id'))
+
+    op.drop_table('token_archive')
+
+    # Tokens that only exist in binary form cannot go back to a NOT NULL text column
+    binary_only = op.get_bind().execute(sa.text("SELECT COUNT(*) FROM token WHERE token IS NULL")).scalar()
+    if binary_only:
+        raise RuntimeError(
+            f"{binary_only} tokens are stored only in binary form; "
+            "restore their text values before downgrading."
+        )
+
+    with op.batch_alter_table('token', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_token_expires_at'))
+        batch_op.drop_constraint('uq_token_token_bin', type_='unique')
+        batch_op.alter_column('token',
+               existing_type=sa.String(length=36),
+               nullable=False)
+        batch_op.drop_column('expires_at')
+        batch_op.drop_column('token_bin')
@@ -0,0 +1,74 @@
+"""Add coordinator_stats table
+
+Revision ID: e41d7a2c9f58
+Revises: c7b2e4f90a13
+Create Date: 2026-10-19 16:22:37.514203
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e41d7a2c9f58'
+down_revision = 'c7b2e4f90a13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('coordinator_stats',
+    sa.Column('coordinator_id', sa.Integer(), nullable=False),
+    sa.Column('active_elections', sa.Integer(), nullable=False),
+    sa.Column('closed_elections', sa.Integer(), nullable=False),
+    sa.Column('voters_invited', sa.Integer(), nullable=False),
+    sa.Column('email_failures', sa.Integer(), nullable=False),
+    sa.Column('closed_votes', sa.Integer(), nullable=False),
+    sa.Column('next_close_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['coordinator_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('coordinator_id')
+    )
+
+    # Every existing coordinator gets a row now: from here on the counters
+    # are only ever bumped, and a missing row means nothing to count.
+    user = sa.table('user', sa.column('id'), sa.column('role'))
+    election = sa.table('election', sa.column('id'), sa.column('coordinator_id'), sa.column('end_time'))
+    voter = sa.table('voter', sa.column('id'), sa.column('election_id'))
+    campaign = sa.table('reminder_campaign', sa.column('election_id'), sa.column('failed'))
+    rollup = sa.table('vote_rollup', sa.column('election_id'), sa.column('granularity'), sa.column('count'))
+    stats = sa.table('coordinator_stats', *(sa.column(name) for name in (
+        'coordinator_id', 'active_elections', 'closed_elections', 'voters_invited',
+        'email_failures', 'closed_votes', 'next_close_at', 'updated_at'
+    )))
+
+    now = datetime.utcnow()
+    owned = election.c.coordinator_id == user.c.id
+    op.execute(stats.insert().from_select(
+        [c.name for c in stats.columns],
+        sa.select(
+            user.c.id,
+            sa.select(sa.func.count()).select_from(election)
+            .where(owned, election.c.end_time > now).scalar_subquery(),
+            sa.select(sa.func.count()).select_from(election)
+            .where(owned, election.c.end_time <= now).scalar_subquery(),
+            sa.select(sa.func.count(voter.c.id))
+            .select_from(voter.join(election, voter.c.election_id == election.c.id))
+            .where(owned).scalar_subquery(),
+            sa.select(sa.func.coalesce(sa.func.sum(campaign.c.failed), 0))
+            .select_from(campaign.join(election, campaign.c.election_id == election.c.id))
+            .where(owned).scalar_subquery(),
+            sa.select(sa.func.coalesce(sa.func.sum(rollup.c.count), 0))
+            .select_from(rollup.join(election, rollup.c.election_id == election.c.id))
+            .where(owned, election.c.end_time <= now, rollup.c.granularity == 'hour').scalar_subquery(),
+            sa.select(sa.func.min(election.c.end_time))
+            .where(owned, election.c.end_time > now).scalar_subquery(),
+            sa.literal(now, sa.DateTime()),
+        ).where(user.c.role == 'coordinator')
+    ))
+
+
+def downgrade():
+    op.drop_table('coordinator_stats')
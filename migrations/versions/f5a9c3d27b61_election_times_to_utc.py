@@ -0,0 +1,78 @@
+"""Store election times in UTC
+
+Revision ID: f5a9c3d27b61
+Revises: b8c3f27e1d94
+Create Date: 2026-10-20 10:12:44.208615
+
+"""
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+from alembic import op
+from flask import current_app
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f5a9c3d27b61'
+down_revision = 'b8c3f27e1d94'
+branch_labels = None
+depends_on = None
+
+election = sa.table('election', sa.column('id', sa.Integer()),
+                    sa.column('start_time', sa.DateTime()), sa.column('end_time', sa.DateTime()))
+token = sa.table('token', sa.column('election_id', sa.Integer()), sa.column('expires_at', sa.DateTime()))
+stats = sa.table('coordinator_stats', sa.column('next_close_at', sa.DateTime()))
+
+BATCH_SIZE = 1000
+
+
+def _to_utc(value, tz):
+    return value.replace(tzinfo=tz).astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _from_utc(value, tz):
+    return value.replace(tzinfo=timezone.utc).astimezone(tz).replace(tzinfo=None)
+
+
+def _convert(convert):
+    """
+    Rewrite every election's start/end time with `convert(value, tz)` for
+    ELECTION_TIMEZONE, then re-derive what was copied from them.
+    """
+    if current_app.config["ELECTION_TIMEZONE"] != "UTC":
+        tz = ZoneInfo(current_app.config["ELECTION_TIMEZONE"])
+        conn = op.get_bind()
+        last_id = 0
+        while True:
+            rows = conn.execute(
+                sa.select(election.c.id, election.c.start_time, election.c.end_time)
+                .where(election.c.id > last_id).order_by(election.c.id).limit(BATCH_SIZE)
+            ).all()
+            if not rows:
+                break
+            # Per row, so each date gets its own DST offset
+            for election_id, start_time, end_time in rows:
+                conn.execute(
+                    election.update().where(election.c.id == election_id)
+                    .values(start_time=convert(start_time, tz), end_time=convert(end_time, tz))
+                )
+            last_id = rows[-1][0]
+
+    # Tokens expire with their election (c7b2e4f90a13 copied the old values)
+    op.execute(token.update().values(expires_at=(
+        sa.select(election.c.end_time).where(election.c.id == token.c.election_id).scalar_subquery()
+    )))
+    # Dashboard rows recount active/closed elections on their next read
+    op.execute(stats.update().values(next_close_at=datetime.utcnow()))
+
+
+def upgrade():
+    # Elections created before times were converted at creation hold the
+    # wall-clock time typed into the form, read here in ELECTION_TIMEZONE.
+    # Run this before serving the new code, so no UTC rows exist yet.
+    _convert(_to_utc)
+
+
+def downgrade():
+    _convert(_from_utc)
@@ -43,6 +43,8 @@ class Election(db.Model):
     voters = db.relationship("Voter", backref="election", cascade="all, delete-orphan", lazy=True)
     tokens = db.relationship("Token", backref="election", cascade="all, delete-orphan", lazy=True)
     votes = db.relationship("Vote", backref="election", cascade="all, delete-orphan", lazy=True)
+    reminder_campaigns = db.relationship("ReminderCampaign", backref="election", cascade="all, delete-orphan", lazy=True)
+    vote_rollups = db.relationship("VoteRollup", cascade="all, delete-orphan", lazy=True)
 
 # -------------------
 # Candidate Model
@@ -90,8 +92,104 @@ class Voter(db.Model):
 # -------------------
 class Token(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    token = db.Column(db.String(36), unique=True, nullable=False, default=lambda: str(uuid.uuid4()))
+    # UUID as text; NULL once the row only keeps the compact 16-byte form
+    token = db.Column(db.String(36), unique=True, nullable=True)
+    token_bin = db.Column(db.LargeBinary(16), unique=True, nullable=True)
     election_id = db.Column(db.Integer, db.ForeignKey('election.id'), nullable=False)
     voter_id = db.Column(db.Integer, db.ForeignKey('voter.id'), nullable=False)
     is_used = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=True, index=True)  # the election's end_time
+
+    @property
+    def value(self):
+        """The token as it appears in voting links, whichever way it is stored."""
+        return Token.link_value(self.token, self.token_bin)
+
+    @staticmethod
+    def link_value(token, token_bin):
+        """Voting-link form of a token from its raw column values (for column-only queries)."""
+        if token:
+            return token
+        return str(uuid.UUID(bytes=token_bin)) if token_bin else None
+
+
+# -------------------
+# Token Archive Model (expired tokens moved out of the hot table)
+# -------------------
+class TokenArchive(db.Model):
+    id = db.Column(db.Integer, primary_key=True)  # same id the token had
+    election_id = db.Column(db.Integer, nullable=False, index=True)
+    voter_id = db.Column(db.Integer, nullable=False)
+    is_used = db.Column(db.Boolean, default=False)
+    created_at = db.Column(db.DateTime, nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=True)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+# -------------------
+# Reminder Campaign Model
+# -------------------
+class ReminderCampaign(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    election_id = db.Column(db.Integer, db.ForeignKey('election.id'), nullable=False, index=True)
+    status = db.Column(db.String(20), nullable=False, default="pending")  # pending, running, finished, failed
+    total = db.Column(db.Integer, nullable=False, default=0)   # unvoted voters when the campaign started
+    sent = db.Column(db.Integer, nullable=False, default=0)
+    failed = db.Column(db.Integer, nullable=False, default=0)
+    last_voter_id = db.Column(db.Integer, nullable=False, default=0)  # keyset cursor, lets a campaign resume
+    heartbeat_at = db.Column(db.DateTime, nullable=True)  # last progress; stale means its worker died
+    started_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "election_id": self.election_id,
+            "status": self.status,
+            "total": self.total,
+            "sent": self.sent,
+            "failed": self.failed,
+            # Voters who cast a ballot mid-campaign are never emailed
+            "skipped": max(self.total - self.sent - self.failed, 0) if self.status == "finished" else 0,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "heartbeat_at": self.heartbeat_at.isoformat() if self.heartbeat_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+# -------------------
+# Vote Rollup Model (turnout time series)
+# -------------------
+class VoteRollup(db.Model):
+    election_id = db.Column(db.Integer, db.ForeignKey('election.id'), primary_key=True)
+    granularity = db.Column(db.String(6), primary_key=True)  # "minute" or "hour"
+    bucket = db.Column(db.DateTime, primary_key=True)        # start of the minute/hour, UTC
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+
+# -------------------
+# Coordinator Stats Model (dashboard summary, updated as things happen)
+# -------------------
+class CoordinatorStats(db.Model):
+    coordinator_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    active_elections = db.Column(db.Integer, nullable=False, default=0)  # end_time still ahead
+    closed_elections = db.Column(db.Integer, nullable=False, default=0)
+    voters_invited = db.Column(db.Integer, nullable=False, default=0)
+    email_failures = db.Column(db.Integer, nullable=False, default=0)   # invitations and reminders
+    closed_votes = db.Column(db.Integer, nullable=False, default=0)     # frozen when elections close
+    next_close_at = db.Column(db.DateTime, nullable=True)  # earliest end_time among active elections
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Open elections' votes are summed from VoteRollup on read (stats.votes_cast)
+
+    def to_dict(self):
+        return {
+            "coordinator_id": self.coordinator_id,
+            "active_elections": self.active_elections,
+            "closed_elections": self.closed_elections,
+            "voters_invited": self.voters_invited,
+            "email_failures": self.email_failures,
+            "closed_votes": self.closed_votes,
+            "next_close_at": self.next_close_at.isoformat() if self.next_close_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+        }
@@ -0,0 +1,188 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import exists, func, or_, update
+
+from extensions import db
+from models import Election, Vote, Voter, Token, ReminderCampaign
+from email_service import get_gmail_service, send_reminder_email
+from stats import bump
+
+
+def unvoted_voters(election_id, after_voter_id=0):
+    """
+    Voters of an election who have neither cast a vote nor used their
+    (unexpired) token, as one anti-join (NOT EXISTS) instead of a lookup
+    per voter.
+
+    Returns plain (voter_id, email, token, token_bin) rows ordered by voter
+    id so the caller can page through them with a keyset cursor.
+    """
+    has_voted = exists().where(
+        Vote.election_id == election_id,
+        Vote.voter_id == Voter.id
+    )
+    return (
+        db.session.query(Voter.id, Voter.email, Token.token, Token.token_bin)
+        .join(Token, Token.voter_id == Voter.id)
+        .filter(
+            Voter.election_id == election_id,
+            Voter.id > after_voter_id,
+            Token.is_used.is_(False),
+            or_(Token.expires_at.is_(None), Token.expires_at > datetime.utcnow()),
+            ~has_voted
+        )
+        .order_by(Voter.id)
+    )
+
+
+def count_unvoted_voters(election_id):
+    return unvoted_voters(election_id).order_by(None).with_entities(func.count(Voter.id)).scalar()
+
+
+def still_unvoted(election_id, voter_id):
+    """Re-check one voter right before emailing them: a primary-key probe, not a scan."""
+    return db.session.query(
+        unvoted_voters(election_id).filter(Voter.id == voter_id).order_by(None).exists()
+    ).scalar()
+
+
+def run_campaign(campaign_id, base_url, rate=None, chunk_size=None, on_progress=None):
+    """
+    Send reminders for a campaign, one chunk of voters at a time.
+
+    Each chunk is a fresh anti-join query starting after the last voter
+    handled, so memory stays flat however large the roster is. Every voter
+    is re-checked just before their email goes out, so anyone who votes
+    while the campaign runs is skipped. Progress (and heartbeat_at) is
+    committed after every voter; a campaign that was interrupted resumes
+    from its cursor when run again.
+    """
+    rate = rate or current_app.config["REMINDER_RATE_PER_SECOND"]
+    chunk_size = chunk_size or current_app.config["REMINDER_CHUNK_SIZE"]
+
+    campaign = db.session.get(ReminderCampaign, campaign_id)
+    election = db.session.get(Election, campaign.election_id)
+    campaign.status = "running"
+    campaign.heartbeat_at = datetime.utcnow()
+    db.session.commit()
+
+    try:
+        service = get_gmail_service()
+    except Exception as e:
+        print(f"❌ Reminder campaign {campaign.id} could not connect to Gmail: {str(e)}")
+        campaign.status = "failed"
+        campaign.finished_at = datetime.utcnow()
+        db.session.commit()
+        return campaign
+
+    interval = 1.0 / rate if rate else 0
+    next_send = time.monotonic()
+    # Plain values: every commit below expires the ORM objects
+    election_id, coordinator_id = election.id, election.coordinator_id
+    title, passcode, end_time = election.title, election.passcode, election.end_time
+
+    while True:
+        chunk = unvoted_voters(election_id, campaign.last_voter_id).limit(chunk_size).all()
+        if not chunk:
+            break
+
+        for voter_id, email, token, token_bin in chunk:
+            # Throttle to `rate` emails per second
+            delay = next_send - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            next_send = max(next_send, time.monotonic()) + interval
+
+            if still_unvoted(election_id, voter_id):
+                success = send_reminder_email(
+                    recipient_email=email,
+                    voting_link=f"{base_url.rstrip('/')}/vote_with_token/{Token.link_value(token, token_bin)}",
+                    election_title=title,
+                    passcode=passcode,
+                    end_time=end_time,
+                    service=service
+                )
+                if success:
+                    campaign.sent += 1
+                else:
+                    campaign.failed += 1
+                    bump(coordinator_id, email_failures=1)
+            campaign.last_voter_id = voter_id
+            campaign.heartbeat_at = datetime.utcnow()
+            db.session.commit()
+
+        if on_progress:
+            on_progress(campaign)
+
+    campaign.status = "finished"
+    campaign.finished_at = datetime.utcnow()
+    db.session.commit()
+    if on_progress:
+        on_progress(campaign)
+    return campaign
+
+
+def start_campaign(election):
+    """Create a campaign for an election, or return the one already running."""
+    running = ReminderCampaign.query.filter(
+        ReminderCampaign.election_id == election.id,
+        ReminderCampaign.status.in_(("pending", "running"))
+    ).first()
+    if running:
+        return running, False
+
+    campaign = ReminderCampaign(election_id=election.id, total=count_unvoted_voters(election.id))
+    db.session.add(campaign)
+    db.session.commit()
+    return campaign, True
+
+
+def claim_stale_campaign(campaign):
+    """
+    Take over a campaign left "pending" or "running" by a worker that died
+    (no progress for REMINDER_STALE_SECONDS). Returns True if this caller
+    won it and should run it; the heartbeat is moved in the same UPDATE,
+    so two requests can't both resume it.
+    """
+    now = datetime.utcnow()
+    last_seen = campaign.heartbeat_at or campaign.started_at
+    if last_seen and last_seen > now - timedelta(seconds=current_app.config["REMINDER_STALE_SECONDS"]):
+        return False
+
+    seen = ReminderCampaign.heartbeat_at
+    result = db.session.execute(
+        update(ReminderCampaign)
+        .where(
+            ReminderCampaign.id == campaign.id,
+            seen.is_(None) if campaign.heartbeat_at is None else seen == campaign.heartbeat_at
+        )
+        .values(heartbeat_at=now)
+    )
+    db.session.commit()
+    return result.rowcount == 1
+
+
+def run_campaign_in_background(campaign_id, base_url):
+    """Run a campaign on a daemon thread so the request that started it can return."""
+    app = current_app._get_current_object()
+
+    def target():
+        with app.app_context():
+            try:
+                run_campaign(campaign_id, base_url)
+            except Exception as e:
+                print(f"❌ Reminder campaign {campaign_id} error: {str(e)}")
+                db.session.rollback()
+                campaign = db.session.get(ReminderCampaign, campaign_id)
+                campaign.status = "failed"
+                campaign.finished_at = datetime.utcnow()
+                db.session.commit()
+            finally:
+                db.session.remove()
+
+    thread = threading.Thread(target=target, name=f"reminders-{campaign_id}", daemon=True)
+    thread.start()
+    return thread
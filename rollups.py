@@ -0,0 +1,154 @@
+import math
+from collections import Counter
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, insert, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from extensions import db
+from models import Vote, VoteRollup
+
+GRANULARITIES = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+}
+
+# Elections longer than this are charted from hourly buckets
+MINUTE_SERIES_MAX_SPAN = timedelta(hours=6)
+
+
+def bucket_start(ts, granularity):
+    if granularity == "minute":
+        return ts.replace(second=0, microsecond=0)
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def rollup_statements(election_id, ts, dialect_name, n=1):
+    """
+    Statements that add `n` votes at `ts` to the minute and hour buckets.
+
+    Postgres and SQLite get a single atomic upsert per bucket; other
+    databases fall back to UPDATE followed by INSERT when nothing matched,
+    which the caller handles (see record_vote).
+    """
+    table = VoteRollup.__table__
+    statements = []
+    for granularity in GRANULARITIES:
+        values = {
+            "election_id": election_id,
+            "granularity": granularity,
+            "bucket": bucket_start(ts, granularity),
+            "count": n,
+        }
+        if dialect_name in ("postgresql", "sqlite"):
+            dialect_insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+            stmt = dialect_insert(table).values(**values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.election_id, table.c.granularity, table.c.bucket],
+                set_={"count": table.c.count + stmt.excluded.count}
+            )
+            statements.append((stmt, None))
+        else:
+            stmt = (
+                update(table)
+                .where(
+                    table.c.election_id == election_id,
+                    table.c.granularity == granularity,
+                    table.c.bucket == values["bucket"]
+                )
+                .values(count=table.c.count + n)
+            )
+            statements.append((stmt, insert(table).values(**values)))
+    return statements
+
+
+def record_vote(election_id, ts):
+    """Count one vote in the rollups, inside the caller's transaction."""
+    dialect_name = db.session.get_bind().dialect.name
+    for stmt, fallback_insert in rollup_statements(election_id, ts, dialect_name):
+        result = db.session.execute(stmt)
+        if fallback_insert is not None and result.rowcount == 0:
+            db.session.execute(fallback_insert)
+
+
+def backfill_election(election_id, batch_size=5000):
+    """
+    Rebuild one election's rollups from the vote ledger.
+
+    Timestamps are streamed in batches and counted in Python, which works
+    the same on every database and only keeps one counter per bucket.
+    """
+    counts = {granularity: Counter() for granularity in GRANULARITIES}
+    timestamps = db.session.execute(
+        db.select(Vote.timestamp)
+        .where(Vote.election_id == election_id, Vote.timestamp.isnot(None))
+        .execution_options(yield_per=batch_size)
+    ).scalars()
+    for ts in timestamps:
+        for granularity, counter in counts.items():
+            counter[bucket_start(ts, granularity)] += 1
+
+    db.session.execute(delete(VoteRollup).where(VoteRollup.election_id == election_id))
+    rows = [
+        {"election_id": election_id, "granularity": granularity, "bucket": bucket, "count": n}
+        for granularity, counter in counts.items()
+        for bucket, n in counter.items()
+    ]
+    if rows:
+        db.session.execute(insert(VoteRollup), rows)
+    db.session.commit()
+    return sum(counts["hour"].values())
+
+
+def turnout_series(election, points=120, granularity=None, now=None):
+    """
+    Votes per bucket and running total from election start to its end (or
+    now, if still open), merged down to at most `points` buckets.
+
+    Long elections read hourly rollups, so the number of rows fetched is
+    bounded by the election's length in hours, not by its vote count.
+    """
+    now = now or datetime.utcnow()
+    start = election.start_time
+    end = min(election.end_time, now)
+    if granularity is None:
+        granularity = "minute" if end - start <= MINUTE_SERIES_MAX_SPAN else "hour"
+    width = GRANULARITIES[granularity]
+
+    first = bucket_start(start, granularity)
+    slots = max(int((end - first) / width) + 1, 1)
+    step = max(math.ceil(slots / points), 1)
+
+    rows = (
+        db.session.query(VoteRollup.bucket, VoteRollup.count)
+        .filter(
+            VoteRollup.election_id == election.id,
+            VoteRollup.granularity == granularity,
+            VoteRollup.bucket >= first,
+            VoteRollup.bucket <= end
+        )
+        .all()
+    )
+
+    merged = [0] * math.ceil(slots / step)
+    for bucket, n in rows:
+        index = int((bucket - first) / width) // step
+        if 0 <= index < len(merged):
+            merged[index] += n
+
+    series = []
+    cumulative = 0
+    for index, n in enumerate(merged):
+        cumulative += n
+        series.append({
+            "t": (first + index * step * width).isoformat(),
+            "votes": n,
+            "cumulative": cumulative,
+        })
+
+    return {
+        "election_id": election.id,
+        "granularity": granularity,
+        "bucket_seconds": int((step * width).total_seconds()),
+        "series": series,
+    }
@@ -0,0 +1,591 @@
+from flask import Blueprint, render_template, request, redirect, url_for, flash, Response, abort, jsonify, current_app
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+import hmac
+import uuid
+from flask_login import login_user, current_user, login_required, logout_user
+from sqlalchemy import func
+
+from extensions import db, login_manager
+from models import User, Election, Candidate, Vote, Voter, Token, ReminderCampaign
+from email_service import send_voting_email
+from live_results import notifier
+from reminders import start_campaign, claim_stale_campaign, run_campaign_in_background
+from rollups import record_vote, turnout_series
+from idempotency import vote_results
+from shared_state import shared_state
+from tokens import issue_token, find_active_token
+from ballots import get_ballot, ballot_namespaces, chosen_candidate_id, invalidate_ballot
+from db_pool import pool_metrics
+from stats import bump, election_deleted, get_dashboard_stats
+from elections import create_election as create_election_batch, send_invitations
+
+
+bp = Blueprint("main", __name__)
+
+# Addresses named in the flash when invitations fail; the rest are counted
+FAILED_EMAILS_SHOWN = 5
+
+
+@login_manager.user_loader
+def load_user(user_id):
+    return User.query.get(int(user_id))
+
+
+# -------------------
+# Routes
+# -------------------
+@bp.route('/')
+def index():
+    return render_template('index.html')
+
+
+# Register
+@bp.route('/register', methods=['GET', 'POST'])
+def register():
+    if request.method == 'POST':
+        email = request.form['email'].lower()
+        password = request.form['password']
+        role = request.form['role']
+
+        existing_user = User.query.filter_by(email=email).first()
+        if existing_user:
+            flash("Email already registered.", "danger")
+            return render_template('register.html', email=email, role=role)
+
+        new_user = User(email=email, role=role)
+        new_user.set_password(password)
+        db.session.add(new_user)
+        db.session.commit()
+
+        flash("Registration successful! Please login.", "success")
+        return redirect(url_for('main.login'))
+
+    return render_template('register.html')
+
+
+# Login
+@bp.route('/login', methods=['GET', 'POST'])
+def login():
+    if request.method == 'POST':
+        email = request.form['email'].lower()
+        password = request.form['password']
+        user = User.query.filter_by(email=email).first()
+
+        if user and user.check_password(password):
+            login_user(user)
+            flash("Login successful!", "success")
+            return redirect(url_for('main.dashboard'))
+        else:
+            flash("Invalid credentials", "danger")
+
+    return render_template('login.html')
+
+
+# Dashboard (Coordinator only)
+@bp.route('/dashboard')
+@login_required
+def dashboard():
+    stats = get_dashboard_stats(current_user.id) if current_user.role == 'coordinator' else None
+    return render_template('dashboard.html', user=current_user, stats=stats)
+
+
+# Create Election
+@bp.route('/create_election', methods=['GET', 'POST'])
+@login_required
+def create_election():
+    if current_user.role != 'coordinator':
+        flash("Access denied. Coordinator role required.", "danger")
+        return redirect(url_for('main.dashboard'))
+
+    if request.method == 'POST':
+        candidates = [
+            {"name": name, "position": position}
+            for name, position in zip(request.form.getlist('contestant_names[]'),
+                                      request.form.getlist('contestant_positions[]'))
+        ]
+        voters = [
+            {"email": email, "phone": phone}
+            for email, phone in zip(request.form.getlist('voter_emails[]'),
+                                    request.form.getlist('voter_phones[]'))
+        ]
+
+        # ✅ Election, candidates, voters and tokens are saved together or not at all
+        try:
+            new_election, candidate_ids, invitations = create_election_batch(
+                current_user.id,
+                title=request.form['title'],
+                description=request.form['description'],
+                passcode=request.form['passcode'],
+                # The browser's UTC conversion when it sent one (DST-correct for
+                # each date), else the typed wall-clock time in ELECTION_TIMEZONE
+                start_time=request.form.get('start_time_utc') or request.form['start_time'],
+                end_time=request.form.get('end_time_utc') or request.form['end_time'],
+                candidates=candidates,
+                voters=voters,
+                tz=ZoneInfo(current_app.config['ELECTION_TIMEZONE'])
+            )
+        except ValueError as e:
+            # Keep what was typed, roster included, so the coordinator can fix it
+            flash(str(e), "danger")
+            return render_template('create_election.html', coordinator=current_user,
+                                   form=request.form, candidates=candidates, voters=voters), 400
+
+        # Failures are summed up in one message: a flash per voter would
+        # overflow the session cookie on a large roster
+        failed, errors = [], []
+
+        def report(email, success, error):
+            if not success:
+                failed.append(email)
+                if error is not None and str(error) not in errors:
+                    errors.append(str(error))
+
+        failures = send_invitations(new_election, invitations, request.url_root, on_result=report)
+        if len(invitations) > failures:
+            flash(f"✓ Voting emails sent to {len(invitations) - failures} voters", "success")
+        if failed:
+            shown = ", ".join(failed[:FAILED_EMAILS_SHOWN])
+            more = f" and {len(failed) - FAILED_EMAILS_SHOWN} more" if len(failed) > FAILED_EMAILS_SHOWN else ""
+            reasons = f" Errors: {'; '.join(errors[:3])}" if errors else ""
+            flash(f"✗ Failed to send {len(failed)} voting emails ({shown}{more}).{reasons}", "danger")
+
+        flash("Election created successfully and voting links sent!", "success")
+        return redirect(url_for('main.manage_elections'))
+
+    return render_template('create_election.html', coordinator=current_user, form={}, candidates=[], voters=[])
+
+
+# Create Election (JSON API)
+@bp.route('/api/elections', methods=['POST'])
+@login_required
+def api_create_election():
+    """
+    {"title", "description", "passcode", "start_time", "end_time" (ISO 8601;
+     UTC unless an offset is given),
+     "candidates": [{"name", "position"}], "voters": [{"email", "phone"}],
+     "send_emails": true}
+    """
+    if current_user.role != 'coordinator':
+        abort(403)
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Expected a JSON object."}), 400
+
+    try:
+        election, candidate_ids, invitations = create_election_batch(
+            current_user.id,
+            title=data.get('title'),
+            description=data.get('description'),
+            passcode=data.get('passcode'),
+            start_time=data.get('start_time'),
+            end_time=data.get('end_time'),
+            candidates=data.get('candidates') or [],
+            voters=data.get('voters') or []
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    sent = failures = 0
+    if data.get('send_emails', True):
+        failures = send_invitations(election, invitations, request.url_root)
+        sent = len(invitations) - failures
+
+    return jsonify({
+        "id": election.id,
+        "candidate_ids": candidate_ids,
+        "voters": len(invitations),
+        "emails_sent": sent,
+        "email_failures": failures,
+    }), 201
+
+
+# Manage Elections
+@bp.route('/elections')
+@login_required
+def manage_elections():
+    if current_user.role != 'coordinator':
+        flash("Coordinator only.", "danger")
+        return redirect(url_for('main.dashboard'))
+
+    elections = Election.query.filter_by(coordinator_id=current_user.id).all()
+    return render_template('manage_elections.html', elections=elections)
+
+
+# Delete Election
+@bp.route("/delete_election/<int:election_id>", methods=["POST"])
+@login_required
+def delete_election(election_id):
+    election = Election.query.get_or_404(election_id)
+
+    if election.coordinator_id != current_user.id:
+        flash("You are not authorized to delete this election.", "danger")
+        return redirect(url_for("main.manage_elections"))
+
+    election_deleted(election)
+    Candidate.query.filter_by(election_id=election.id).delete()
+    Voter.query.filter_by(election_id=election.id).delete()
+    Token.query.filter_by(election_id=election.id).delete()
+
+    db.session.delete(election)
+    db.session.commit()
+    invalidate_ballot(election_id)
+
+    flash("Election deleted successfully.", "success")
+    return redirect(url_for("main.manage_elections"))
+
+
+# Manage Candidates
+@bp.route('/election/<int:election_id>/candidates')
+@login_required
+def manage_candidates(election_id):
+    election = Election.query.get_or_404(election_id)
+
+    # Candidate list with vote counts
+    candidates_with_votes = (
+        db.session.query(
+            Candidate.id,
+            Candidate.name,
+            Candidate.position,
+            func.count(Vote.id).label("votes")
+        )
+        .outerjoin(Vote, Candidate.id == Vote.candidate_id)
+        .filter(Candidate.election_id == election_id)
+        .group_by(Candidate.id)
+        .all()
+    )
+
+    # Total votes cast in this election
+    total_votes = (
+        db.session.query(func.count(Vote.id))
+        .filter(Vote.election_id == election_id)
+        .scalar()
+    )
+
+    # Total registered voters
+    total_voters = (
+        db.session.query(func.count(Voter.id))
+        .filter(Voter.election_id == election_id)
+        .scalar()
+    )
+
+    turnout_percentage = (
+        (total_votes / total_voters * 100) if total_voters > 0 else 0
+    )
+
+    return render_template(
+        "manage_candidates.html",
+        election=election,
+        candidates=candidates_with_votes,
+        total_votes=total_votes,
+        total_voters=total_voters,
+        turnout_percentage=turnout_percentage
+    )
+
+
+# Live Results (Server-Sent Events)
+@bp.route('/election/<int:election_id>/results/stream')
+@login_required
+def results_stream(election_id):
+    election = Election.query.get_or_404(election_id)
+    if election.coordinator_id != current_user.id:
+        abort(403)
+
+    stream = notifier.open_stream(election.id)
+    if stream is None:
+        # Every stream slot of this worker is taken; the page retries later
+        retry = current_app.config["LIVE_RESULTS_RETRY_SECONDS"]
+        return Response(
+            f"retry: {retry * 1000}\n\n",
+            status=503,
+            mimetype="text/event-stream",
+            headers={"Retry-After": str(retry), "Cache-Control": "no-cache"}
+        )
+
+    return Response(
+        stream,
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# Turnout Time Series (for dashboard charts)
+@bp.route('/election/<int:election_id>/turnout.json')
+@login_required
+def turnout_json(election_id):
+    election = Election.query.get_or_404(election_id)
+    if election.coordinator_id != current_user.id:
+        abort(403)
+
+    points = min(max(request.args.get('points', 120, type=int), 1), 1000)
+    granularity = request.args.get('granularity')
+    if granularity not in (None, "minute", "hour"):
+        abort(400)
+
+    return jsonify(turnout_series(election, points=points, granularity=granularity))
+
+
+# Reminder Campaigns (re-send links to voters who haven't voted)
+@bp.route('/election/<int:election_id>/reminders', methods=['POST'])
+@login_required
+def send_reminders(election_id):
+    election = Election.query.get_or_404(election_id)
+
+    if election.coordinator_id != current_user.id:
+        flash("You are not authorized to send reminders for this election.", "danger")
+        return redirect(url_for("main.manage_elections"))
+
+    campaign, created = start_campaign(election)
+    if created:
+        run_campaign_in_background(campaign.id, request.url_root)
+        flash(f"Sending reminders to {campaign.total} voters who haven't voted yet.", "success")
+    elif claim_stale_campaign(campaign):
+        # Its worker restarted mid-campaign; carry on from the cursor
+        run_campaign_in_background(campaign.id, request.url_root)
+        flash(f"Resuming the reminder campaign after {campaign.sent + campaign.failed} of "
+              f"{campaign.total} voters.", "info")
+    else:
+        flash("A reminder campaign is already running for this election.", "warning")
+
+    return redirect(url_for("main.manage_elections"))
+
+
+@bp.route('/election/<int:election_id>/reminders/status')
+@login_required
+def reminder_status(election_id):
+    election = Election.query.get_or_404(election_id)
+    if election.coordinator_id != current_user.id:
+        abort(403)
+
+    campaign = (
+        ReminderCampaign.query.filter_by(election_id=election.id)
+        .order_by(ReminderCampaign.id.desc())
+        .first()
+    )
+    return jsonify(campaign.to_dict() if campaign else None)
+
+
+# Add Voters
+@bp.route('/election/<int:election_id>/add_voters', methods=['GET', 'POST'])
+@login_required
+def add_voters(election_id):
+    if current_user.role != "coordinator":
+        flash("Access denied. Coordinator role required.", "danger")
+        return redirect(url_for('main.dashboard'))
+
+    election = Election.query.get_or_404(election_id)
+
+    if request.method == 'POST':
+        email = request.form['email'].lower()
+        phone = request.form.get('phone', '')
+
+        # Prevent duplicates
+        existing_voter = Voter.query.filter_by(email=email, election_id=election.id).first()
+        if existing_voter:
+            flash("This voter is already registered for this election.", "warning")
+            return redirect(url_for('main.add_voters', election_id=election.id))
+
+        # Create new voter
+        new_voter = Voter(email=email, phone=phone, election_id=election.id)
+        db.session.add(new_voter)
+        db.session.commit()
+
+        # Generate unique token
+        new_token, token_value = issue_token(new_voter, election)
+        bump(election.coordinator_id, voters_invited=1)
+        db.session.commit()
+
+        shared_state.invalidate(f"results:{election.id}")  # turnout denominator changed
+
+        # ✅ Send email when voter is added
+        voting_link = f"{request.url_root}vote_with_token/{token_value}"
+        try:
+            success = send_voting_email(
+                recipient_email=new_voter.email,
+                voting_link=voting_link,
+                election_title=election.title,
+                passcode=election.passcode,
+                start_time=election.start_time,
+                end_time=election.end_time
+            )
+            if success:
+                flash(f"✓ Voting email sent to {new_voter.email}", "success")
+            else:
+                flash(f"✗ Failed to send email to {new_voter.email}", "warning")
+        except Exception as e:
+            success = False
+            flash(f"Error sending email to {new_voter.email}: {str(e)}", "danger")
+        if not success:
+            bump(election.coordinator_id, email_failures=1)
+            db.session.commit()
+
+        return redirect(url_for('main.add_voters', election_id=election.id))
+
+    voters = Voter.query.filter_by(election_id=election.id).options(db.joinedload(Voter.token)).all()
+    return render_template('add_voters.html', election=election, voters=voters)
+
+# Vote With Token
+def _ballot(election_id):
+    """Election and candidates for the ballot page, shared across workers."""
+    payload = get_ballot(election_id)
+    if payload is None:
+        abort(404)
+    return ballot_namespaces(payload)
+
+
+def _render_ballot(election, token, candidates):
+    # Every rendered form gets a fresh key; retries of that form reuse it
+    return render_template(
+        "vote_with_token.html",
+        election=election,
+        token=token,
+        candidates=candidates,
+        idempotency_key=uuid.uuid4().hex
+    )
+
+
+@bp.route('/vote_with_token/<token>', methods=['GET', 'POST'])
+def vote_with_token(token):
+    if request.method == 'POST':
+        idempotency_key = request.form.get('idempotency_key', '')
+
+        # ✅ Repeat submission of the same form: replay the original outcome
+        outcome = vote_results.claim(token, idempotency_key)
+        if outcome is not None:
+            flash(outcome["message"], outcome["category"])
+            return redirect(outcome["location"] or url_for('main.index'))
+
+        try:
+            return _cast_vote(token, idempotency_key)
+        except Exception:
+            vote_results.release(token, idempotency_key)
+            raise
+
+    # Find the token record
+    token_record = find_active_token(token)
+    if not token_record:
+        flash("❌ Invalid or expired voting link.", "danger")
+        return redirect(url_for('main.index'))
+
+    election, candidates = _ballot(token_record.election_id)
+    return _render_ballot(election, token, candidates)
+
+
+def _cast_vote(token, idempotency_key):
+    ballot_url = url_for('main.vote_with_token', token=token)
+
+    def reject(message, category, election=None, candidates=None):
+        flash(message, category)
+        vote_results.store(token, idempotency_key, category, message, ballot_url if election else None)
+        if election is None:
+            return redirect(url_for('main.index'))
+        return _render_ballot(election, token, candidates)
+
+    # Find the token record
+    token_record = find_active_token(token)
+    if not token_record:
+        return reject("❌ Invalid or expired voting link.", "danger")
+
+    election, candidates = _ballot(token_record.election_id)
+
+    email = request.form['email'].lower()
+    passcode = request.form['passcode']
+
+    # ✅ Check passcode
+    if passcode != election.passcode:
+        return reject("❌ Invalid election passcode.", "danger", election, candidates)
+
+    # ✅ Check if email matches the assigned voter
+    voter = Voter.query.filter_by(email=email, election_id=election.id).first()
+    if not voter:
+        return reject("❌ This email is not registered for this election.", "danger", election, candidates)
+
+    # ✅ Check if token already used
+    if token_record.is_used:
+        return reject("⚠️ This voting link has already been used.", "warning", election, candidates)
+
+    # ✅ Check if this voter has already voted (duplicate protection)
+    existing_vote = Vote.query.filter_by(voter_id=voter.id, election_id=election.id).first()
+    if existing_vote:
+        return reject("⚠️ You have already voted in this election.", "warning", election, candidates)
+
+    # ✅ Only a candidate on this election's ballot
+    candidate_id = chosen_candidate_id(request.form.get('candidate'), candidates)
+    if candidate_id is None:
+        abort(400)
+
+    # ✅ Save vote
+    voted_at = datetime.utcnow()
+    new_vote = Vote(
+        voter_id=voter.id,
+        candidate_id=candidate_id,
+        election_id=election.id,
+        timestamp=voted_at
+    )
+
+    db.session.add(new_vote)
+    token_record.is_used = True  # Mark token as used
+    record_vote(election.id, voted_at)  # Turnout rollups, same transaction
+    db.session.commit()
+    shared_state.invalidate(f"results:{election.id}")
+    notifier.notify(election.id)
+
+    message = "✅ Your vote has been recorded successfully!"
+    vote_results.store(token, idempotency_key, "success", message, url_for("main.index"))
+    flash(message, "success")
+    return redirect(url_for("main.index"))
+
+
+# Test Email
+@bp.route('/test_email/<email>')
+def test_email(email):
+    try:
+        test_link = f"{request.url_root}vote_with_token/test123"
+        test_title = "Test Election"
+        test_passcode = "TEST123"
+        start = datetime.utcnow()
+        end = start + timedelta(hours=24)
+
+        success = send_voting_email(
+            recipient_email=email,
+            voting_link=test_link,
+            election_title=test_title,
+            passcode=test_passcode,
+            start_time=start,
+            end_time=end
+        )
+        if success:
+            return f"✓ Test email sent to {email} successfully!"
+        else:
+            return f"✗ Failed to send test email to {email}"
+
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+
+# Operator metrics (per worker process)
+@bp.route('/ops/pool')
+def ops_pool():
+    ops_token = current_app.config["OPS_TOKEN"]
+    if not ops_token or not hmac.compare_digest(request.headers.get("X-Ops-Token", ""), ops_token):
+        abort(404)
+    return jsonify(pool_metrics())
+
+
+# Logout
+@bp.route('/logout')
+@login_required
+def logout():
+    logout_user()
+    flash("Logged out.", "info")
+    return redirect(url_for('main.index'))
+
+
+# Privacy + Terms
+@bp.route("/privacy")
+def privacy():
+    return render_template("privacy.html")
+
+@bp.route("/terms")
+def terms():
+    return render_template("terms.html")
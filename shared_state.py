@@ -0,0 +1,320 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process backend is available
+    fcntl = None
+
+
+def _hash_key(key):
+    # 0 marks an empty slot, so never hand it out
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little") | 1
+
+
+class InProcessState:
+    """Counters and blobs in a dict. Each process sees only its own values."""
+
+    is_shared = False
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._blobs = {}
+
+    def incr(self, key, n=1):
+        with self._lock:
+            value = self._counters.get(key, 0) + n
+            self._counters[key] = value
+            return value
+
+    def get_counter(self, key):
+        return self._counters.get(key, 0)
+
+    def ensure_counter(self, key):
+        return self._counters.get(key, 0)
+
+    def get_blob(self, key):
+        return self._blobs.get(key)
+
+    def set_blob(self, key, value):
+        self._blobs[key] = value
+        return True
+
+
+class MmapState:
+    """
+    Counters and blobs in a memory-mapped file shared by every worker on
+    the host.
+
+    The file holds two open-addressed hash tables of fixed-size slots.
+    Writers serialise on an flock; readers never lock. Blob slots carry a
+    sequence number that is odd while a write is in progress, and readers
+    retry until they see the same even number before and after copying the
+    data. Entries are never removed, so size the tables for the number of
+    elections a host serves; when a table is full, writes are dropped and
+    callers fall back to the database. A key that can't get a counter slot
+    has no generation to invalidate, so SharedState never caches it.
+
+    The slot counts are fixed when the file is created. A process
+    configured with a different layout refuses to open it rather than
+    truncating a file other workers still have mapped.
+
+    Layout:  header | counter slots (hash u64, value i64) |
+             blob slots (hash u64, seq u32, length u32, data)
+    """
+
+    is_shared = True
+
+    MAGIC = b"BBSTATE1"
+    HEADER = struct.Struct("<8sIII")        # magic, counter slots, blob slots, blob slot size
+    HEADER_SIZE = 64
+    COUNTER = struct.Struct("<Qq")
+    BLOB_HEAD = struct.Struct("<QII")
+
+    def __init__(self, path, counter_slots=65536, blob_slots=2048, blob_slot_size=4096):
+        if fcntl is None:
+            raise RuntimeError("The mmap shared state backend needs fcntl (POSIX only).")
+        self.path = path
+        self.counter_slots = counter_slots
+        self.blob_slots = blob_slots
+        self.blob_slot_size = blob_slot_size
+        self._blob_base = self.HEADER_SIZE + counter_slots * self.COUNTER.size
+        self._size = self._blob_base + blob_slots * blob_slot_size
+        self._pid = None
+        self._thread_lock = threading.Lock()
+        self._open()
+
+    def _open(self):
+        # flock belongs to the open file description, which a forked child
+        # shares with its parent, so every process opens the file itself.
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            header = self.HEADER.pack(self.MAGIC, self.counter_slots, self.blob_slots, self.blob_slot_size)
+            size = os.fstat(fd).st_size
+            if size == 0:
+                os.ftruncate(fd, self._size)
+                os.pwrite(fd, header, 0)
+            elif size != self._size or os.pread(fd, self.HEADER.size, 0) != header:
+                raise RuntimeError(
+                    f"{self.path} was created with a different shared state layout and may be in use "
+                    "by running workers. Point SHARED_STATE_PATH at a new file, or delete this one "
+                    "once every worker has stopped."
+                )
+            self._map = mmap.mmap(fd, self._size)
+        except Exception:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+            raise
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        self._fd = fd
+        self._pid = os.getpid()
+
+    def _ensure_open(self):
+        if self._pid != os.getpid():
+            self._open()
+
+    @contextmanager
+    def _locked(self):
+        with self._thread_lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    # -------------------
+    # Counters
+    # -------------------
+    def _counter_offset(self, key_hash, insert):
+        for probe in range(self.counter_slots):
+            index = (key_hash + probe) % self.counter_slots
+            offset = self.HEADER_SIZE + index * self.COUNTER.size
+            slot_hash = struct.unpack_from("<Q", self._map, offset)[0]
+            if slot_hash == key_hash:
+                return offset
+            if slot_hash == 0:
+                if insert:
+                    struct.pack_into("<Q", self._map, offset, key_hash)
+                    return offset
+                return None
+        return None
+
+    def incr(self, key, n=1):
+        self._ensure_open()
+        with self._locked():
+            offset = self._counter_offset(_hash_key(key), insert=True)
+            if offset is None:
+                return None
+            value = struct.unpack_from("<q", self._map, offset + 8)[0] + n
+            struct.pack_into("<q", self._map, offset + 8, value)
+            return value
+
+    def get_counter(self, key):
+        self._ensure_open()
+        offset = self._counter_offset(_hash_key(key), insert=False)
+        if offset is None:
+            return 0
+        return struct.unpack_from("<q", self._map, offset + 8)[0]
+
+    def ensure_counter(self, key):
+        """A counter's value, giving it a slot first if needed; None when the table is full."""
+        self._ensure_open()
+        key_hash = _hash_key(key)
+        offset = self._counter_offset(key_hash, insert=False)
+        if offset is None:
+            with self._locked():
+                offset = self._counter_offset(key_hash, insert=True)
+            if offset is None:
+                return None
+        return struct.unpack_from("<q", self._map, offset + 8)[0]
+
+    # -------------------
+    # Blobs
+    # -------------------
+    def _blob_offset(self, key_hash, insert):
+        for probe in range(self.blob_slots):
+            index = (key_hash + probe) % self.blob_slots
+            offset = self._blob_base + index * self.blob_slot_size
+            slot_hash = struct.unpack_from("<Q", self._map, offset)[0]
+            if slot_hash == key_hash:
+                return offset
+            if slot_hash == 0:
+                if insert:
+                    struct.pack_into("<Q", self._map, offset, key_hash)
+                    return offset
+                return None
+        return None
+
+    def get_blob(self, key):
+        self._ensure_open()
+        key_hash = _hash_key(key)
+        offset = self._blob_offset(key_hash, insert=False)
+        if offset is None:
+            return None
+        data_start = offset + self.BLOB_HEAD.size
+        for _ in range(100):
+            _, seq, length = self.BLOB_HEAD.unpack_from(self._map, offset)
+            if seq & 1:
+                continue
+            data = self._map[data_start:data_start + length]
+            if self.BLOB_HEAD.unpack_from(self._map, offset)[1] == seq:
+                return data if length else None
+        return None
+
+    def set_blob(self, key, value):
+        self._ensure_open()
+        if len(value) > self.blob_slot_size - self.BLOB_HEAD.size:
+            return False
+        with self._locked():
+            offset = self._blob_offset(_hash_key(key), insert=True)
+            if offset is None:
+                return False
+            seq = self.BLOB_HEAD.unpack_from(self._map, offset)[1]
+            struct.pack_into("<I", self._map, offset + 8, (seq + 1) & 0xFFFFFFFF)  # odd: write in progress
+            data_start = offset + self.BLOB_HEAD.size
+            self._map[data_start:data_start + len(value)] = value
+            struct.pack_into("<I", self._map, offset + 12, len(value))
+            struct.pack_into("<I", self._map, offset + 8, (seq + 2) & 0xFFFFFFFF)
+            return True
+
+
+class SharedState:
+    """
+    Cross-worker counters, cached election metadata and invalidation
+    generations, backed by SHARED_STATE_BACKEND ("mmap" or "memory").
+    """
+
+    def __init__(self, app=None):
+        self.backend = InProcessState()
+        self._warned_full = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if app.config["SHARED_STATE_BACKEND"] == "mmap":
+            path = app.config["SHARED_STATE_PATH"] or os.path.join(app.instance_path, "shared_state.bin")
+            self.backend = MmapState(
+                path,
+                counter_slots=app.config["SHARED_STATE_COUNTER_SLOTS"],
+                blob_slots=app.config["SHARED_STATE_BLOB_SLOTS"],
+                blob_slot_size=app.config["SHARED_STATE_BLOB_SLOT_SIZE"]
+            )
+        else:
+            self.backend = InProcessState()
+        app.extensions["shared_state"] = self
+
+    @property
+    def is_shared(self):
+        return self.backend.is_shared
+
+    # -------------------
+    # Counters and generations
+    # -------------------
+    def incr(self, key, n=1):
+        return self.backend.incr(key, n)
+
+    def get_counter(self, key):
+        return self.backend.get_counter(key)
+
+    def generation(self, name):
+        """
+        The current generation of `name`, or None when the backend has no
+        room to track it (then invalidate() can't reach it either, so
+        anything read under it must be treated as stale).
+        """
+        generation = self.backend.ensure_counter(f"gen:{name}")
+        if generation is None and not self._warned_full:
+            self._warned_full = True
+            print("⚠️ Shared state counter table is full; new keys won't be cached. "
+                  "Raise SHARED_STATE_COUNTER_SLOTS and use a new SHARED_STATE_PATH.")
+        return generation
+
+    def invalidate(self, name):
+        """Bump a generation so every worker drops values cached under it."""
+        return self.backend.incr(f"gen:{name}")
+
+    # -------------------
+    # Cached values
+    # -------------------
+    def lookup(self, key):
+        """
+        Return (generation, hit, value) for a cached value. `hit` is False
+        when nothing is cached or it was cached under an older generation;
+        pass the returned generation to store() when refilling.
+        """
+        generation = self.generation(key)
+        if generation is None:
+            return None, False, None
+        blob = self.backend.get_blob(key)
+        if blob is not None:
+            entry = json.loads(blob)
+            if entry["gen"] == generation:
+                return generation, True, entry["value"]
+        return generation, False, None
+
+    def store(self, key, generation, value):
+        if generation is None:  # untracked key: nothing could ever invalidate it
+            return
+        self.backend.set_blob(key, json.dumps({"gen": generation, "value": value}).encode())
+
+    def cached(self, key, loader):
+        """
+        Return the JSON-serialisable value cached under `key`, calling
+        `loader()` to (re)build it when missing or invalidated.
+        """
+        generation, hit, value = self.lookup(key)
+        if not hit:
+            value = loader()
+            self.store(key, generation, value)
+        return value
+
+
+shared_state = SharedState()
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import event
+
+from extensions import db
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\$\d+|(?<!:):(?!:)\w+|\?")
+_IN_LIST = re.compile(r"IN \((?:\?, )*\?\)", re.IGNORECASE)
+
+EXPLAIN_PREFIX = {
+    "postgresql": "EXPLAIN ",
+    "sqlite": "EXPLAIN QUERY PLAN ",
+}
+
+
+def normalize_sql(statement):
+    """Collapse a statement to its shape: literals and placeholders become ?, IN lists IN (...)."""
+    sql = _WHITESPACE.sub(" ", statement).strip()
+    sql = _STRING.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    return _IN_LIST.sub("IN (...)", sql)
+
+
+def fingerprint(normalized_sql):
+    return hashlib.sha1(normalized_sql.encode()).hexdigest()[:12]
+
+
+def parameters_shape(parameters, executemany):
+    """Types (never values) of the bound parameters."""
+    def shape(params):
+        if isinstance(params, dict):
+            return {key: type(value).__name__ for key, value in params.items()}
+        if isinstance(params, (list, tuple)):
+            return [type(value).__name__ for value in params]
+        return type(params).__name__
+
+    if executemany:
+        return {"executemany": len(parameters), "row": shape(parameters[0]) if parameters else None}
+    return shape(parameters)
+
+
+class SlowQueryLog:
+    """
+    Appends every statement slower than SLOW_QUERY_THRESHOLD_MS to a JSON
+    lines file (SLOW_QUERY_LOG, default <instance>/slow_queries.jsonl) with
+    its normalized SQL, parameter types, duration and, for SELECTs, the
+    query plan. Plans are captured once per statement shape per process,
+    so a hot slow query does not trigger an EXPLAIN on every execution.
+    `python check_db.py slow-queries` summarises the file.
+    """
+
+    MAX_EXPLAINED = 1000
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._explained = set()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.threshold = app.config["SLOW_QUERY_THRESHOLD_MS"] / 1000.0
+        self.path = app.config["SLOW_QUERY_LOG"] or os.path.join(app.instance_path, "slow_queries.jsonl")
+        app.extensions["slow_query_log"] = self
+        if self.threshold <= 0:
+            return
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with app.app_context():
+            for engine in db.engines.values():
+                self.watch(engine)
+
+    def watch(self, engine):
+        """
+        Time statements on an engine the app doesn't own, e.g. asgi.py's
+        (pass an AsyncEngine's .sync_engine). A no-op when logging is off.
+        """
+        if self.threshold <= 0:
+            return
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info["slow_query_start"] = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info.pop("slow_query_start", time.perf_counter())
+        if duration < self.threshold:
+            return
+
+        try:
+            normalized = normalize_sql(statement)
+            key = fingerprint(normalized)
+            plan = None
+            if not executemany and normalized.lstrip("( ").upper().startswith(("SELECT", "WITH")):
+                with self._lock:
+                    first_time = key not in self._explained and len(self._explained) < self.MAX_EXPLAINED
+                    if first_time:
+                        self._explained.add(key)
+                if first_time:
+                    plan = self._explain(conn, statement, parameters)
+
+            record = {
+                "ts": datetime.utcnow().isoformat(),
+                "fingerprint": key,
+                "sql": normalized,
+                "params": parameters_shape(parameters, executemany),
+                "duration_ms": round(duration * 1000, 2),
+                "plan": plan,
+            }
+            with self._lock, open(self.path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+        except Exception as e:
+            print(f"❌ Slow query log error: {str(e)}")
+
+    def _explain(self, conn, statement, parameters):
+        dialect = conn.dialect.name
+        prefix = EXPLAIN_PREFIX.get(dialect)
+        if prefix is None:
+            return None
+
+        # A raw DBAPI cursor, so the EXPLAIN neither fires these hooks nor
+        # shows up in SQLAlchemy's own logging.
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            if dialect == "postgresql":
+                # A failed EXPLAIN would otherwise abort the caller's transaction
+                cursor.execute("SAVEPOINT slow_query_explain")
+            try:
+                cursor.execute(prefix + statement, parameters)
+                rows = cursor.fetchall()
+            except Exception as e:
+                if dialect == "postgresql":
+                    cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+                return [f"EXPLAIN failed: {str(e)}"]
+            if dialect == "postgresql":
+                cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+                return [row[0] for row in rows]
+            return [row[-1] for row in rows]  # sqlite: (id, parent, notused, detail)
+        finally:
+            cursor.close()
+
+
+slow_query_log = SlowQueryLog()
@@ -0,0 +1,194 @@
+from datetime import datetime
+
+from sqlalchemy import case, func, insert, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from extensions import db
+from models import CoordinatorStats, Election, ReminderCampaign, VoteRollup, Voter
+
+
+def _upsert(coordinator_id, insert_values, update_values):
+    """
+    Create a coordinator's row from `insert_values`, or apply `update_values`
+    to it, inside the caller's transaction. Either way the row stays locked
+    until the caller commits.
+
+    Postgres and SQLite get one atomic upsert; other databases fall back to
+    UPDATE followed by INSERT when nothing matched, as the rollups do.
+    """
+    table = CoordinatorStats.__table__
+    now = datetime.utcnow()
+    update_values = dict(update_values, updated_at=now)
+    dialect_name = db.session.get_bind().dialect.name
+    if dialect_name in ("postgresql", "sqlite"):
+        dialect_insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+        stmt = dialect_insert(table).values(coordinator_id=coordinator_id, updated_at=now, **insert_values)
+        db.session.execute(stmt.on_conflict_do_update(index_elements=[table.c.coordinator_id], set_=update_values))
+        return
+    result = db.session.execute(
+        update(table).where(table.c.coordinator_id == coordinator_id).values(**update_values)
+    )
+    if result.rowcount == 0:
+        db.session.execute(insert(table).values(coordinator_id=coordinator_id, updated_at=now, **insert_values))
+
+
+def bump(coordinator_id, **deltas):
+    """
+    Add to a coordinator's counters (voters_invited=, email_failures=),
+    inside the caller's transaction. A coordinator without a row has
+    nothing counted yet, so the first bump creates it.
+    """
+    if any(deltas.values()):
+        table = CoordinatorStats.__table__
+        _upsert(coordinator_id, deltas, {name: table.c[name] + n for name, n in deltas.items()})
+
+
+def election_created(election, voters_invited=0):
+    """Count a new election and its roster, inside the transaction that creates it."""
+    table = CoordinatorStats.__table__
+    if election.end_time > datetime.utcnow():
+        insert_values = {"active_elections": 1, "next_close_at": election.end_time}
+        update_values = {
+            "active_elections": table.c.active_elections + 1,
+            "next_close_at": case(
+                (or_(table.c.next_close_at.is_(None), table.c.next_close_at > election.end_time), election.end_time),
+                else_=table.c.next_close_at
+            ),
+        }
+    else:
+        insert_values = {"closed_elections": 1}
+        update_values = {"closed_elections": table.c.closed_elections + 1}
+    _upsert(
+        election.coordinator_id,
+        dict(insert_values, voters_invited=voters_invited),
+        dict(update_values, voters_invited=table.c.voters_invited + voters_invited)
+    )
+
+
+def election_deleted(election):
+    """Take an election's voters off the counters, before deleting it."""
+    stats = CoordinatorStats
+    now = datetime.utcnow()
+    voters = db.session.scalar(select(func.count(Voter.id)).where(Voter.election_id == election.id))
+    # Whether it was still counted as active depends on whether the row has
+    # caught up with its end_time, so recount active/closed (and the closed
+    # elections' votes) on the next read.
+    db.session.execute(
+        update(stats)
+        .where(stats.coordinator_id == election.coordinator_id)
+        .values(voters_invited=stats.voters_invited - voters, next_close_at=now, updated_at=now)
+    )
+
+
+def _election_counts(coordinator_id, now):
+    """(active, closed, earliest end_time of the active ones) in one aggregate query."""
+    is_open = Election.end_time > now
+    return db.session.execute(
+        select(
+            func.count(case((is_open, 1))),
+            func.count(case((Election.end_time <= now, 1))),
+            func.min(case((is_open, Election.end_time))),
+        ).where(Election.coordinator_id == coordinator_id)
+    ).one()
+
+
+def _rollup_votes(coordinator_id, *conditions):
+    return db.session.scalar(
+        select(func.coalesce(func.sum(VoteRollup.count), 0))
+        .join(Election, Election.id == VoteRollup.election_id)
+        .where(Election.coordinator_id == coordinator_id, VoteRollup.granularity == "hour", *conditions)
+    )
+
+
+def _closed_votes(coordinator_id, now):
+    """Votes in elections that have closed; stored on the row whenever active/closed are recounted."""
+    return _rollup_votes(coordinator_id, Election.end_time <= now)
+
+
+def votes_cast(coordinator_id, closed_votes=0, now=None):
+    """
+    Votes in a coordinator's elections, without a counter bumped per vote
+    (a contended UPDATE on every ballot). Closed elections' votes are the
+    frozen `closed_votes` of the stats row; open elections are summed live
+    from their hourly turnout rollups. That read touches one rollup row per
+    open election per hour it has been running, so it is bounded by the
+    open elections' combined length in hours (e.g. 3 open week-long
+    elections: at most ~500 rows) and doesn't grow with past elections.
+    """
+    now = now or datetime.utcnow()
+    return closed_votes + _rollup_votes(coordinator_id, Election.end_time > now)
+
+
+def rebuild(coordinator_id):
+    """
+    Recount a coordinator's row from the elections and voters tables.
+    Invitation failures are not recorded anywhere else, so an existing
+    email_failures is kept; a new row starts from the reminder campaigns.
+
+    The row is written (created or touched) before counting, so it is
+    locked for the whole recount: a change committed before the lock is
+    in the counts, and one arriving during it waits and bumps the result.
+    """
+    elections = select(Election.id).where(Election.coordinator_id == coordinator_id)
+    campaign_failures = db.session.scalar(
+        select(func.coalesce(func.sum(ReminderCampaign.failed), 0))
+        .where(ReminderCampaign.election_id.in_(elections))
+    )
+    _upsert(coordinator_id, {"email_failures": campaign_failures}, {})
+
+    now = datetime.utcnow()
+    active, closed, next_close_at = _election_counts(coordinator_id, now)
+    db.session.execute(
+        update(CoordinatorStats)
+        .where(CoordinatorStats.coordinator_id == coordinator_id)
+        .values(
+            active_elections=active,
+            closed_elections=closed,
+            closed_votes=_closed_votes(coordinator_id, now),
+            next_close_at=next_close_at,
+            voters_invited=db.session.scalar(
+                select(func.count(Voter.id)).where(Voter.election_id.in_(elections))
+            ),
+            updated_at=now
+        )
+    )
+    db.session.commit()
+    return get_dashboard_stats(coordinator_id)
+
+
+def get_dashboard_stats(coordinator_id):
+    """
+    A coordinator's dashboard summary: one primary-key read plus the
+    open elections' hourly vote rollups (see votes_cast). No row means
+    nothing counted yet. Active and closed elections, and the closed
+    elections' votes, are recounted only once an active election has
+    passed its end_time.
+    """
+    now = datetime.utcnow()
+    stats = db.session.get(CoordinatorStats, coordinator_id)
+    if stats is not None and stats.next_close_at is not None and stats.next_close_at <= now:
+        # Claim the recount with a conditional UPDATE, which also locks the
+        # row so an election created meanwhile can't slip between the count
+        # and the write.
+        claimed = db.session.execute(
+            update(CoordinatorStats)
+            .where(CoordinatorStats.coordinator_id == coordinator_id, CoordinatorStats.next_close_at <= now)
+            .values(updated_at=now)
+        ).rowcount
+        if claimed:
+            active, closed, next_close_at = _election_counts(coordinator_id, now)
+            db.session.execute(
+                update(CoordinatorStats)
+                .where(CoordinatorStats.coordinator_id == coordinator_id)
+                .values(active_elections=active, closed_elections=closed, next_close_at=next_close_at,
+                        closed_votes=_closed_votes(coordinator_id, now))
+            )
+        db.session.commit()
+        stats = db.session.get(CoordinatorStats, coordinator_id)
+
+    if stats is None:  # not added to the session: the first bump creates the row
+        stats = CoordinatorStats(coordinator_id=coordinator_id, active_elections=0, closed_elections=0,
+                                 voters_invited=0, email_failures=0, closed_votes=0)
+    summary = stats.to_dict()
+    summary["votes_cast"] = votes_cast(coordinator_id, stats.closed_votes, now)
+    return summary
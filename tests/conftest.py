@@ -0,0 +1,61 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def app():
+    from app import create_app
+    from extensions import db
+
+    app = create_app("testing", {"SQLALCHEMY_DATABASE_URI": "sqlite://"})
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def coordinator(app):
+    from extensions import db
+    from models import User
+
+    user = User(email="coordinator@example.com", role="coordinator")
+    user.set_password("secret")
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def client(app, coordinator):
+    client = app.test_client()
+    client.post("/login", data={"email": coordinator.email, "password": "secret"})
+    return client
+
+
+@pytest.fixture
+def make_election(coordinator):
+    """
+    Factory for the coordinator's elections, created the way the app does
+    (elections.create_election): tokens, dashboard stats and all. Times are
+    offsets from now.
+    """
+    from datetime import datetime, timedelta
+
+    from elections import create_election
+
+    def make(voters=0, candidates=("Ada",), starts_in=timedelta(0), ends_in=timedelta(days=1), title="Board"):
+        now = datetime.utcnow()
+        election, _, _ = create_election(
+            coordinator.id, title, "pass", now + starts_in, now + ends_in,
+            candidates=[{"name": name, "position": "Chair"} for name in candidates],
+            voters=[{"email": f"v{i}@example.com"} for i in range(voters)]
+        )
+        return election
+
+    return make
@@ -0,0 +1,48 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from app import create_app
+from config import ProductionConfig, TestingConfig, get_config
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def imported_after(code):
+    """Modules loaded by `code` in a fresh interpreter, as a worker would start."""
+    out = subprocess.run(
+        [sys.executable, "-c", f"import sys\n{code}\nprint(' '.join(sys.modules))"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+        env=dict(os.environ, BALLOTBOX_CONFIG="testing")
+    )
+    return set(out.stdout.split())
+
+
+def test_profiles_are_picked_by_name_or_environment(monkeypatch):
+    assert get_config("testing") is TestingConfig
+    monkeypatch.setenv("BALLOTBOX_CONFIG", "testing")
+    assert get_config() is TestingConfig
+    monkeypatch.delenv("BALLOTBOX_CONFIG")
+    assert get_config() is ProductionConfig
+    with pytest.raises(ValueError, match="Unknown config profile"):
+        get_config("staging")
+
+
+def test_each_app_gets_its_own_config():
+    first = create_app("testing", {"OPS_TOKEN": "a"})
+    second = create_app("testing")
+    assert first.config["OPS_TOKEN"] == "a" and second.config["OPS_TOKEN"] is None
+    assert "main" in first.blueprints and "send-reminders" in first.cli.commands
+
+
+def test_worker_startup_skips_the_google_client():
+    modules = imported_after("from app import create_app\ncreate_app()")
+    assert "routes" in modules
+    assert not any(name.startswith(("googleapiclient", "google_auth_oauthlib")) for name in modules)
+
+
+def test_config_and_extensions_import_no_views():
+    modules = imported_after("import config, extensions")
+    assert not {"routes", "live_results", "models"} & modules
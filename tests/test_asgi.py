@@ -0,0 +1,110 @@
+import asyncio
+import importlib
+import sys
+from datetime import datetime, timedelta
+from urllib.parse import urlencode
+
+import pytest
+
+from config import TestingConfig
+
+
+@pytest.fixture
+def asgi(tmp_path):
+    """asgi.py on a file database, which its async engine shares with the Flask app."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("BALLOTBOX_CONFIG", "testing")
+        mp.setattr(TestingConfig, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'asgi.db'}")
+        sys.modules.pop("asgi", None)
+        module = importlib.import_module("asgi")
+        with module.flask_app.app_context():
+            from extensions import db
+            db.create_all()
+            yield module
+            db.session.remove()
+        sys.modules.pop("asgi", None)
+
+
+def seed():
+    """An open election with one voter, and another election: (link token, email, candidate id, foreign candidate id)."""
+    from elections import create_election
+    from extensions import db
+    from models import Candidate, Token, User
+
+    coordinator = User(email="coordinator@example.com", role="coordinator")
+    coordinator.set_password("secret")
+    db.session.add(coordinator)
+    db.session.commit()
+    now = datetime.utcnow()
+    elections = [
+        create_election(coordinator.id, title, "pass", now, now + timedelta(days=1),
+                        candidates=[{"name": name, "position": "Chair"}],
+                        voters=[{"email": "v0@example.com"}])[0]
+        for title, name in (("Board", "Ada"), ("Other", "Grace"))
+    ]
+    own, foreign = (Candidate.query.filter_by(election_id=e.id).one().id for e in elections)
+    token = Token.query.filter_by(election_id=elections[0].id).one().value
+    return token, "v0@example.com", own, foreign
+
+
+def request(asgi, *calls):
+    """
+    Drive the ASGI app directly with (method, path, form) calls, all on one
+    event loop since the async engine's pool is bound to it. Returns
+    (status, headers, body) per call.
+    """
+    results = []
+
+    async def one(method, path, form):
+        body = urlencode(form or {}).encode()
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+            "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+            "headers": [(b"host", b"testserver"), (b"content-type", b"application/x-www-form-urlencoded")],
+            "client": ("127.0.0.1", 1234), "server": ("testserver", 80),
+        }
+        messages = [{"type": "http.request", "body": body, "more_body": False}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+
+        await asgi.app(scope, receive, send)
+        results.append((sent[0]["status"], dict(sent[0]["headers"]), b"".join(m.get("body", b"") for m in sent[1:])))
+
+    async def main():
+        try:
+            for call in calls:
+                await one(*call)
+        finally:  # or aiosqlite's connection threads keep the process alive
+            await asgi.engine.dispose()
+
+    asyncio.run(main())
+    return results
+
+
+def test_async_ballot_and_vote(asgi):
+    from models import Token, Vote
+
+    token, email, candidate_id, foreign_id = seed()
+    path = f"/vote_with_token/{token}"
+    form = {"email": email, "passcode": "pass"}
+
+    page, bad, foreign, good = request(
+        asgi,
+        ("GET", path, None),
+        ("POST", path, dict(form, candidate="abc", idempotency_key="k0")),
+        ("POST", path, dict(form, candidate=foreign_id, idempotency_key="k1")),
+        ("POST", path, dict(form, candidate=candidate_id, idempotency_key="k0")),
+    )
+    assert page[0] == 200 and b"Ada" in page[2]
+    assert (bad[0], foreign[0]) == (400, 400)
+    # "k0" was released by the 400, so reusing it casts the vote
+    assert good[0] == 302 and good[1][b"location"] == b"/"
+
+    vote = Vote.query.one()
+    assert vote.candidate_id == candidate_id
+    assert Token.query.filter_by(election_id=vote.election_id).one().is_used
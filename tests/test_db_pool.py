@@ -0,0 +1,53 @@
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+import db_pool
+from db_pool import InstrumentedQueuePool, engine_options, pool_metrics, register_engine
+
+
+def test_sqlite_keeps_the_default_pool():
+    assert engine_options({"SQLALCHEMY_DATABASE_URI": "sqlite:///ballotbox.db"}) == {}
+
+
+def test_server_databases_get_the_instrumented_pool():
+    config = {"SQLALCHEMY_DATABASE_URI": "postgresql://db/ballotbox", "DB_POOL_SIZE": 10, "DB_MAX_OVERFLOW": 5,
+              "DB_POOL_TIMEOUT": 10.0, "DB_POOL_RECYCLE": 900, "DB_POOL_PRE_PING": True}
+    options = engine_options(config)
+    assert options["poolclass"] is InstrumentedQueuePool
+    assert (options["pool_size"], options["max_overflow"], options["pool_timeout"]) == (10, 5, 10.0)
+
+
+def test_pool_counts_checkouts_and_timeouts(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedQueuePool,
+                           pool_size=1, max_overflow=0, pool_timeout=0.1)
+    held = engine.connect()
+    held.execute(text("SELECT 1"))
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    held.close()
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    metrics = engine.pool.metrics()
+    assert (metrics["checkouts"], metrics["timeouts"], metrics["peak_checked_out"]) == (2, 1, 1)
+    assert metrics["checked_out"] == 0
+
+    engine.dispose()  # a fresh pool keeps counting
+    assert engine.pool.metrics()["checkouts"] == 2
+
+
+def test_ops_pool_needs_the_token(app, monkeypatch, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'async.db'}", poolclass=InstrumentedQueuePool)
+    monkeypatch.setattr(db_pool, "_extra_engines", {})
+    register_engine("async", engine)
+    client = app.test_client()
+
+    assert client.get("/ops/pool").status_code == 404  # OPS_TOKEN unset
+    app.config["OPS_TOKEN"] = "s3cret"
+    assert client.get("/ops/pool", headers={"X-Ops-Token": "wrong"}).status_code == 404
+
+    response = client.get("/ops/pool", headers={"X-Ops-Token": "s3cret"})
+    assert response.status_code == 200
+    assert set(response.json["engines"]) == {"default", "async"}
+    assert response.json["engines"]["async"]["checkouts"] == 0
+    assert pool_metrics()["engines"]["default"] == {"status": db_pool.db.engine.pool.status()}
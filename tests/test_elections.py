@@ -0,0 +1,134 @@
+from datetime import datetime
+
+from extensions import db
+from models import Candidate, Election, Token, Voter
+
+
+def election_json(**overrides):
+    data = {
+        "title": "Board",
+        "passcode": "pass",
+        "start_time": "2026-10-19T09:00:00Z",
+        "end_time": "2026-10-20T09:00:00+02:00",
+        "candidates": [{"name": "Ada", "position": "Chair"}, {"name": "Grace", "position": "Chair"}],
+        "voters": [{"email": "A@example.com"}, {"email": "a@example.com"}, {"email": "b@example.com"}],
+        "send_emails": False,
+    }
+    data.update(overrides)
+    return data
+
+
+def test_api_creates_election_with_roster(client):
+    response = client.post("/api/elections", json=election_json())
+    assert response.status_code == 201
+    body = response.get_json()
+    assert len(body["candidate_ids"]) == 2
+    assert body["voters"] == 2  # repeated email kept once
+
+    election = db.session.get(Election, body["id"])
+    assert Candidate.query.filter_by(election_id=election.id).count() == 2
+    assert Voter.query.filter_by(election_id=election.id).count() == 2
+    assert Token.query.filter_by(election_id=election.id).count() == 2
+
+
+def test_api_converts_offset_timestamps_to_naive_utc(client):
+    response = client.post("/api/elections", json=election_json())
+    assert response.status_code == 201
+
+    election = db.session.get(Election, response.get_json()["id"])
+    assert election.start_time == datetime(2026, 10, 19, 9, 0)
+    assert election.end_time == datetime(2026, 10, 20, 7, 0)
+    assert Token.query.filter_by(election_id=election.id).first().expires_at == election.end_time
+
+
+def test_api_rejects_invalid_input(client):
+    assert client.post("/api/elections", json=election_json(start_time="tomorrow")).status_code == 400
+    assert client.post("/api/elections", json=election_json(end_time="2026-10-18T09:00:00Z")).status_code == 400
+    assert client.post("/api/elections", json=election_json(voters=["a@example.com"])).status_code == 400
+    assert Election.query.count() == 0
+
+
+def test_form_keeps_roster_when_input_is_invalid(client):
+    response = client.post("/create_election", data={
+        "title": "Board",
+        "description": "",
+        "passcode": "pass",
+        "start_time": "2026-10-20T09:00",
+        "end_time": "2026-10-19T09:00",
+        "contestant_names[]": ["Ada"],
+        "contestant_positions[]": ["Chair"],
+        "voter_emails[]": ["a@example.com", "b@example.com"],
+        "voter_phones[]": ["", ""],
+    })
+    assert response.status_code == 400
+    page = response.get_data(as_text=True)
+    assert "The election must end after it starts." in page
+    assert 'value="Ada"' in page and 'value="b@example.com"' in page
+    assert Election.query.count() == 0
+
+
+def form_data(**overrides):
+    data = {
+        "title": "Board",
+        "description": "",
+        "passcode": "pass",
+        "start_time": "2026-07-01T09:00",
+        "end_time": "2026-12-01T09:00",
+        "contestant_names[]": ["Ada"],
+        "contestant_positions[]": ["Chair"],
+    }
+    data.update(overrides)
+    return data
+
+
+def test_form_stores_the_browsers_utc_conversion(client):
+    response = client.post("/create_election", data=form_data(
+        start_time_utc="2026-07-01T07:00:00.000Z",
+        end_time_utc="2026-12-01T08:00:00.000Z",
+    ))
+    assert response.status_code == 302
+    election = Election.query.one()
+    assert (election.start_time, election.end_time) == (datetime(2026, 7, 1, 7, 0), datetime(2026, 12, 1, 8, 0))
+
+
+def test_form_reads_typed_times_in_election_timezone(app, client):
+    app.config["ELECTION_TIMEZONE"] = "Europe/Berlin"
+    assert client.post("/create_election", data=form_data()).status_code == 302
+    election = Election.query.one()
+    # Summer and winter time each get their own offset
+    assert (election.start_time, election.end_time) == (datetime(2026, 7, 1, 7, 0), datetime(2026, 12, 1, 8, 0))
+
+
+def test_invitations_share_one_gmail_client(app, monkeypatch):
+    import elections
+
+    services, sent = [], []
+    monkeypatch.setattr(elections, "get_gmail_service", lambda: services.append(object()) or services[-1])
+    monkeypatch.setattr(elections, "send_voting_email", lambda **kw: sent.append(kw["service"]) or True)
+
+    election = Election(title="T", passcode="p", coordinator_id=1,
+                        start_time=datetime(2026, 1, 1), end_time=datetime(2026, 1, 2))
+    failures = elections.send_invitations(election, [("a@example.com", "t1"), ("b@example.com", "t2")], "http://x/")
+    assert failures == 0
+    assert len(services) == 1 and sent == services * 2
+
+
+def test_failed_invitations_are_one_flash(client, monkeypatch):
+    import elections
+
+    def no_gmail():
+        raise RuntimeError("Gmail credentials missing")
+
+    monkeypatch.setattr(elections, "get_gmail_service", no_gmail)
+    emails = [f"v{i}@example.com" for i in range(5000)]
+    response = client.post("/create_election", data=form_data(
+        **{"voter_emails[]": emails, "voter_phones[]": [""] * len(emails)}
+    ))
+    assert response.status_code == 302
+
+    with client.session_transaction() as session:
+        flashes = session["_flashes"]
+    failure = [message for category, message in flashes if category == "danger"]
+    assert failure == ["✗ Failed to send 5000 voting emails (v0@example.com, v1@example.com, v2@example.com, "
+                       "v3@example.com, v4@example.com and 4995 more). Errors: Gmail credentials missing"]
+    assert len(response.headers["Set-Cookie"]) < 4093
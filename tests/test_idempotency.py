@@ -0,0 +1,113 @@
+import os
+import threading
+
+import pytest
+
+import idempotency
+from idempotency import PENDING, FileResultStore, MemoryResultStore
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    import time
+    clock = FakeClock(time.time())
+    monkeypatch.setattr(idempotency, "time", clock)
+    return clock
+
+
+@pytest.fixture(params=["memory", "file"])
+def store(request, tmp_path, clock):
+    if request.param == "memory":
+        return MemoryResultStore(600)
+    return FileResultStore(str(tmp_path / "idempotency"), 600)
+
+
+def test_one_reservation_per_key(store):
+    assert store.reserve("k")
+    assert not store.reserve("k")
+    assert store.get("k") is PENDING
+    assert store.reserve("other")
+
+
+def test_outcome_replaces_reservation(store):
+    store.reserve("k")
+    store.put("k", {"category": "success"})
+    assert store.get("k") == {"category": "success"}
+    assert not store.reserve("k")
+
+
+def test_release_frees_the_key(store):
+    store.reserve("k")
+    store.release("k")
+    assert store.get("k") is None
+    assert store.reserve("k")
+
+
+def test_entries_expire(store, clock, tmp_path):
+    store.reserve("k")
+    clock.now += 601
+    if isinstance(store, FileResultStore):
+        # mtimes come from the real clock; age the file to match
+        for root, _, files in os.walk(store.directory):
+            for name in files:
+                os.utime(os.path.join(root, name), (clock.now - 601, clock.now - 601))
+    assert store.get("k") is None
+    assert store.reserve("k")
+
+
+def test_reservation_race_has_one_winner(tmp_path):
+    store = FileResultStore(str(tmp_path), 600)
+    wins = []
+    barrier = threading.Barrier(8)
+
+    def contend():
+        barrier.wait()
+        wins.append(store.reserve("k"))
+
+    threads = [threading.Thread(target=contend) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert wins.count(True) == 1
+
+
+def test_file_store_keeps_previous_bucket_and_drops_older(tmp_path, clock):
+    store = FileResultStore(str(tmp_path), 600)
+    clock.now = 600 * 1000 + 599  # end of bucket 1000
+    store.reserve("old")
+    store.put("old", {"category": "success"})
+    os.utime(store._path("old", 1000), (clock.now, clock.now))
+
+    clock.now += 2  # bucket 1001: "old" is still live in the previous bucket
+    assert store.get("old") == {"category": "success"}
+    assert not store.reserve("old")
+    store._sweeper.join()
+    assert os.path.isdir(os.path.join(str(tmp_path), "1000"))
+
+    clock.now += 600  # bucket 1002: bucket 1000 is dropped whole, off the request path
+    store.reserve("new")
+    store._sweeper.join()
+    assert sorted(os.listdir(str(tmp_path))) == ["1002"]
+
+
+def test_memory_purge_stops_at_first_live_entry(clock):
+    store = MemoryResultStore(600)
+    for i in range(1000):
+        store.reserve(f"k{i}")
+    clock.now += 300
+    store.reserve("late")
+    clock.now += 301
+    store.reserve("trigger")  # purges the first 1000, keeps "late"
+    assert list(store._items) == ["late", "trigger"]
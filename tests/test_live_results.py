@@ -0,0 +1,64 @@
+import asyncio
+
+from live_results import notifier
+
+
+def test_sync_streams_are_capped_per_worker(app, client, make_election):
+    app.config["LIVE_RESULTS_MAX_STREAMS"] = 1
+    notifier.init_app(app)
+    url = f"/election/{make_election().id}/results/stream"
+
+    first = client.get(url, buffered=False)
+    assert first.status_code == 200
+
+    refused = client.get(url)
+    assert refused.status_code == 503
+    assert refused.headers["Retry-After"] == "30"
+    assert refused.get_data(as_text=True).startswith("retry: 30000")
+
+    first.close()  # browser went away: the slot is free again
+    second = client.get(url, buffered=False)
+    assert second.status_code == 200
+    second.close()
+
+
+def test_async_stream_is_woken_by_the_notifier_thread(app):
+    notifier.init_app(app)
+
+    async def watch():
+        stream = notifier.astream(4242)
+        assert await stream.__anext__() == "retry: 5000\n\n"
+        waiting = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0.05)
+        # What the notifier thread does after computing a tally
+        sub = next(iter(notifier._subscribers[4242]))
+        await asyncio.to_thread(sub.push, {"election_id": 4242, "candidates": {"1": 3}, "total_votes": 3})
+        event = await asyncio.wait_for(waiting, 2)
+        await stream.aclose()
+        return event
+
+    event = asyncio.run(watch())
+    assert event.startswith("event: results\n") and '"total_votes": 3' in event
+    assert 4242 not in notifier._subscribers
+
+
+def test_notifier_thread_survives_a_failing_poll(app, make_election, monkeypatch):
+    app.config.update(LIVE_RESULTS_POLL_SECONDS=0.01, LIVE_RESULTS_MAX_UPDATES_PER_SECOND=100)
+    notifier.init_app(app)
+    election_id = make_election().id
+    failures = []
+
+    def changed_elsewhere(eid):
+        if not failures:
+            failures.append(eid)
+            raise RuntimeError("shared state unavailable")
+        return True
+
+    monkeypatch.setattr(notifier, "_changed_elsewhere", changed_elsewhere)
+    sub = notifier.subscribe(election_id)
+    try:
+        update = sub.get(2)
+    finally:
+        notifier.unsubscribe(election_id, sub)
+    assert failures == [election_id]
+    assert update["election_id"] == election_id
@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import reminders
+from extensions import db
+from models import ReminderCampaign, Vote, Voter
+
+
+def test_voter_who_votes_mid_chunk_is_skipped(app, make_election, monkeypatch):
+    election = make_election(voters=3)
+    voters = Voter.query.filter_by(election_id=election.id).order_by(Voter.id).all()
+    sent = []
+
+    def send(recipient_email, **kwargs):
+        sent.append(recipient_email)
+        if len(sent) == 1:  # the last voter votes while the first email goes out
+            db.session.add(Vote(voter_id=voters[2].id, candidate_id=1, election_id=election.id))
+        return True
+
+    monkeypatch.setattr(reminders, "get_gmail_service", lambda: object())
+    monkeypatch.setattr(reminders, "send_reminder_email", send)
+
+    campaign, _ = reminders.start_campaign(election)
+    campaign = reminders.run_campaign(campaign.id, "http://x/", rate=1000, chunk_size=10)
+    assert sent == ["v0@example.com", "v1@example.com"]
+    assert campaign.to_dict()["skipped"] == 1
+
+
+def test_stale_campaign_is_claimed_once(app, make_election):
+    election = make_election(voters=1)
+    campaign, created = reminders.start_campaign(election)
+    assert created
+    assert not reminders.claim_stale_campaign(campaign)  # just started
+
+    campaign.status = "running"
+    campaign.heartbeat_at = datetime.utcnow() - timedelta(hours=1)
+    db.session.commit()
+    assert reminders.claim_stale_campaign(campaign)
+
+    stale_copy = ReminderCampaign(id=campaign.id, heartbeat_at=datetime.utcnow() - timedelta(hours=1))
+    assert not reminders.claim_stale_campaign(stale_copy)  # someone else already took it
+
+
+def test_cli_refuses_a_campaign_another_worker_is_running(app, make_election, monkeypatch):
+    election = make_election(voters=1)
+    reminders.start_campaign(election)  # e.g. from the web route, thread still sending
+    monkeypatch.setattr(reminders, "run_campaign", lambda *a, **kw: pytest.fail("sent twice"))
+
+    result = app.test_cli_runner().invoke(args=["send-reminders", str(election.id)])
+    assert result.exit_code == 1
+    assert "is already running" in result.output
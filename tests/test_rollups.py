@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta
+
+from extensions import db
+from models import Candidate, Vote, VoteRollup, Voter
+from rollups import backfill_election, record_vote, turnout_series
+
+START = datetime(2026, 10, 19, 9, 0)
+
+
+def schedule(election, hours):
+    election.start_time, election.end_time = START, START + timedelta(hours=hours)
+    db.session.commit()
+    return election
+
+
+def cast(election, *timestamps):
+    """Votes as the vote view records them: a ledger row plus the rollups."""
+    voters = Voter.query.filter_by(election_id=election.id).order_by(Voter.id).all()
+    candidate = Candidate.query.filter_by(election_id=election.id).first()
+    for voter, ts in zip(voters, timestamps):
+        db.session.add(Vote(voter_id=voter.id, candidate_id=candidate.id, election_id=election.id, timestamp=ts))
+        record_vote(election.id, ts)
+    db.session.commit()
+
+
+def rollups(election_id):
+    return sorted(
+        (r.granularity, r.bucket, r.count)
+        for r in VoteRollup.query.filter_by(election_id=election_id)
+    )
+
+
+def test_record_vote_counts_minute_and_hour_buckets(make_election):
+    election = make_election(voters=3)
+    cast(election, START + timedelta(seconds=10), START + timedelta(seconds=50), START + timedelta(minutes=61))
+    assert rollups(election.id) == [
+        ("hour", START, 2),
+        ("hour", START + timedelta(hours=1), 1),
+        ("minute", START, 2),
+        ("minute", START + timedelta(minutes=61), 1),
+    ]
+
+
+def test_short_election_series_is_per_minute_and_cumulative(make_election):
+    election = schedule(make_election(voters=3), hours=1)
+    cast(election, START, START + timedelta(minutes=2, seconds=30), START + timedelta(minutes=2))
+
+    result = turnout_series(election, now=START + timedelta(minutes=3))
+    assert (result["granularity"], result["bucket_seconds"]) == ("minute", 60)
+    assert [(p["votes"], p["cumulative"]) for p in result["series"]] == [(1, 1), (0, 1), (2, 3), (0, 3)]
+    assert result["series"][2]["t"] == (START + timedelta(minutes=2)).isoformat()
+
+
+def test_long_election_reads_hourly_rollups(make_election):
+    election = schedule(make_election(voters=2), hours=48)
+    cast(election, START + timedelta(hours=5, minutes=59), START + timedelta(hours=30))
+
+    result = turnout_series(election, now=START + timedelta(days=3))
+    assert (result["granularity"], result["bucket_seconds"]) == ("hour", 3600)
+    assert len(result["series"]) == 49  # through the closing hour, not `now`
+    assert result["series"][5]["votes"] == 1
+    assert result["series"][-1]["cumulative"] == 2
+
+
+def test_series_is_merged_down_to_points(make_election):
+    election = schedule(make_election(voters=3), hours=72)
+    cast(election, START, START + timedelta(hours=36), START + timedelta(hours=71, minutes=59))
+
+    # An explicit minute series over three days: 4321 minutes in 10 points
+    result = turnout_series(election, points=10, granularity="minute", now=START + timedelta(days=4))
+    assert result["granularity"] == "minute"
+    assert result["bucket_seconds"] == 433 * 60  # ceil(4321 / 10) minutes, reported as merged
+    votes = [p["votes"] for p in result["series"]]
+    assert len(votes) == 10 and sum(votes) == 3
+    assert votes[0] == votes[-1] == 1
+
+
+def test_not_yet_started_election_has_an_empty_series(make_election):
+    election = schedule(make_election(), hours=2)
+    result = turnout_series(election, now=START - timedelta(hours=1))
+    assert result["series"] == [{"t": START.isoformat(), "votes": 0, "cumulative": 0}]
+
+
+def test_backfill_matches_live_rollups(make_election):
+    election = schedule(make_election(voters=4), hours=4)
+    cast(election, START, START + timedelta(seconds=5), START + timedelta(minutes=90), START + timedelta(hours=3))
+    live = rollups(election.id)
+
+    db.session.query(VoteRollup).delete()
+    db.session.commit()
+    assert backfill_election(election.id, batch_size=2) == 4
+    assert rollups(election.id) == live
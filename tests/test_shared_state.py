@@ -0,0 +1,108 @@
+import multiprocessing
+import os
+
+import pytest
+
+from shared_state import InProcessState, MmapState, SharedState
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="the mmap backend needs fcntl")
+
+
+def make_state(backend):
+    state = SharedState()
+    state.backend = backend
+    return state
+
+
+def small_state(path):
+    return MmapState(str(path), counter_slots=4, blob_slots=8, blob_slot_size=256)
+
+
+def test_cache_hit_until_invalidated(tmp_path):
+    state = make_state(small_state(tmp_path / "state.bin"))
+    generation, hit, _ = state.lookup("election:1")
+    assert not hit
+    state.store("election:1", generation, {"title": "Board"})
+    assert state.lookup("election:1") == (generation, True, {"title": "Board"})
+
+    state.invalidate("election:1")
+    assert state.lookup("election:1")[1] is False
+
+
+def test_full_counter_table_never_serves_stale_values(tmp_path):
+    state = make_state(small_state(tmp_path / "state.bin"))
+    for i in range(4):
+        state.incr(f"filler:{i}")
+
+    generation, hit, _ = state.lookup("election:1")
+    assert (generation, hit) == (None, False)
+    state.store("election:1", generation, {"title": "Old"})
+    assert state.invalidate("election:1") is None
+    assert state.lookup("election:1") == (None, False, None)
+    assert state.cached("election:1", lambda: {"title": "New"}) == {"title": "New"}
+
+
+def test_keys_cached_before_the_table_filled_still_invalidate(tmp_path):
+    state = make_state(small_state(tmp_path / "state.bin"))
+    generation, _, _ = state.lookup("election:1")
+    state.store("election:1", generation, "old")
+    for i in range(3):
+        state.incr(f"filler:{i}")
+
+    state.invalidate("election:1")
+    assert state.lookup("election:1")[1] is False
+
+
+def test_blob_too_large_is_not_cached(tmp_path):
+    state = make_state(small_state(tmp_path / "state.bin"))
+    generation, _, _ = state.lookup("big")
+    state.store("big", generation, "x" * 1000)
+    assert state.lookup("big")[1] is False
+
+
+def test_refuses_a_file_with_another_layout(tmp_path):
+    path = tmp_path / "state.bin"
+    first = small_state(path)
+    first.incr("votes")
+
+    with pytest.raises(RuntimeError, match="different shared state layout"):
+        MmapState(str(path), counter_slots=8, blob_slots=8, blob_slot_size=256)
+    assert first.get_counter("votes") == 1
+    assert small_state(path).get_counter("votes") == 1
+
+
+def _bump(path, key, times):
+    backend = small_state(path)
+    for _ in range(times):
+        backend.incr(key)
+
+
+def test_counters_are_shared_between_processes(tmp_path):
+    path = tmp_path / "state.bin"
+    backend = small_state(path)
+    ctx = multiprocessing.get_context("fork")
+    workers = [ctx.Process(target=_bump, args=(str(path), "gen:results:1", 200)) for _ in range(3)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+        assert w.exitcode == 0
+    assert backend.get_counter("gen:results:1") == 600
+
+
+def test_forked_child_reopens_the_file(tmp_path):
+    backend = small_state(tmp_path / "state.bin")
+    backend.incr("k")
+    ctx = multiprocessing.get_context("fork")
+    child = ctx.Process(target=backend.incr, args=("k", 5))
+    child.start()
+    child.join()
+    assert backend.get_counter("k") == 6
+
+
+def test_in_process_backend_always_tracks_generations():
+    state = make_state(InProcessState())
+    generation, hit, _ = state.lookup("election:1")
+    assert generation == 0 and not hit
+    state.store("election:1", generation, 1)
+    assert state.lookup("election:1")[1]
@@ -0,0 +1,64 @@
+import json
+
+import pytest
+from sqlalchemy import text
+
+from app import create_app
+from check_db import report_slow_queries
+from extensions import db
+from slow_queries import fingerprint, normalize_sql
+
+
+def test_normalize_sql_keeps_only_the_statement_shape():
+    sql = """SELECT * FROM voter
+             WHERE email = 'o''brien@example.com' AND id > 42 AND score = -3.5
+             AND election_id IN (?, ?, ?) AND a = :p AND b = %(q)s AND c = $1"""
+    assert normalize_sql(sql) == (
+        "SELECT * FROM voter WHERE email = ? AND id > ? AND score = ? "
+        "AND election_id IN (...) AND a = ? AND b = ? AND c = ?"
+    )
+    assert normalize_sql("SELECT t1.col2 FROM t1") == "SELECT t1.col2 FROM t1"  # identifiers keep digits
+    assert fingerprint(normalize_sql("SELECT 1 FROM t WHERE id = 7")) == \
+        fingerprint(normalize_sql("SELECT 1 FROM t WHERE id = 8"))
+
+
+def logged_app(tmp_path, threshold_ms):
+    app = create_app("testing", {
+        "SLOW_QUERY_THRESHOLD_MS": threshold_ms,
+        "SLOW_QUERY_LOG": str(tmp_path / "slow.jsonl"),
+    })
+    return app, tmp_path / "slow.jsonl"
+
+
+def run(app, *statements):
+    with app.app_context():
+        db.session.execute(text("CREATE TABLE IF NOT EXISTS probe (id INTEGER PRIMARY KEY, name TEXT)"))
+        for sql in statements:
+            db.session.execute(text(sql))
+        db.session.commit()
+
+
+def test_statements_under_the_threshold_are_not_logged(tmp_path):
+    app, log = logged_app(tmp_path, threshold_ms=60_000)
+    run(app, "SELECT name FROM probe WHERE id = 1")
+    assert not log.exists()
+
+
+def test_slow_statements_are_logged_with_one_plan_per_shape(tmp_path, capsys):
+    app, log = logged_app(tmp_path, threshold_ms=0.0001)
+    run(app,
+        "INSERT INTO probe (name) VALUES ('secret')",
+        "SELECT name FROM probe WHERE name = 'secret-1' AND id > 10",
+        "SELECT name FROM probe WHERE name = 'secret-2' AND id > 20")
+
+    records = [json.loads(line) for line in log.read_text().splitlines()]
+    selects = [r for r in records if r["sql"].startswith("SELECT name FROM probe")]
+    assert len(selects) == 2 and selects[0]["fingerprint"] == selects[1]["fingerprint"]
+    assert selects[0]["plan"] and selects[1]["plan"] is None  # EXPLAINed once per process
+    assert all(r["plan"] is None for r in records if r["sql"].startswith("INSERT"))
+    assert "secret" not in log.read_text()  # literals never reach the log
+
+    report_slow_queries(str(log), top=10)
+    out = capsys.readouterr().out
+    assert f"[{selects[0]['fingerprint']}] 2 calls" in out
+    assert "FULL SCAN" in out or "plan:" in out
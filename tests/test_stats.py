@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+
+from extensions import db
+from models import CoordinatorStats, Election, ReminderCampaign
+from rollups import record_vote
+import stats as stats_module
+from stats import bump, get_dashboard_stats, rebuild
+
+
+def test_no_row_means_nothing_counted(coordinator):
+    stats = get_dashboard_stats(coordinator.id)
+    assert (stats["active_elections"], stats["voters_invited"], stats["votes_cast"]) == (0, 0, 0)
+    assert db.session.get(CoordinatorStats, coordinator.id) is None
+
+
+def test_counters_follow_elections_and_bumps(coordinator, make_election):
+    make_election(voters=2)
+    make_election(voters=1, starts_in=-timedelta(days=2), ends_in=-timedelta(days=1))
+    bump(coordinator.id, email_failures=3)
+    db.session.commit()
+
+    stats = get_dashboard_stats(coordinator.id)
+    assert (stats["active_elections"], stats["closed_elections"]) == (1, 1)
+    assert (stats["voters_invited"], stats["email_failures"]) == (3, 3)
+
+
+def test_first_bump_creates_the_row(coordinator):
+    bump(coordinator.id, email_failures=1)
+    db.session.commit()
+    assert get_dashboard_stats(coordinator.id)["email_failures"] == 1
+
+
+def test_votes_cast_come_from_hourly_rollups(coordinator, make_election):
+    election = make_election(voters=2)
+    now = datetime.utcnow()
+    for ts in (now, now, now - timedelta(hours=3)):
+        record_vote(election.id, ts)
+    db.session.commit()
+    assert get_dashboard_stats(coordinator.id)["votes_cast"] == 3
+
+
+def test_active_elections_are_recounted_after_they_close(coordinator, monkeypatch, make_election):
+    election = make_election(voters=2)
+    record_vote(election.id, datetime.utcnow())
+    db.session.commit()
+
+    class Later(datetime):
+        @classmethod
+        def utcnow(cls):
+            return datetime.utcnow() + timedelta(days=2)
+
+    monkeypatch.setattr(stats_module, "datetime", Later)
+    stats = get_dashboard_stats(coordinator.id)
+    assert (stats["active_elections"], stats["closed_elections"], stats["next_close_at"]) == (0, 1, None)
+    # Its votes are frozen on the row, no longer summed from the rollups
+    assert (stats["closed_votes"], stats["votes_cast"]) == (1, 1)
+
+
+def test_rebuild_recounts_and_keeps_email_failures(coordinator, make_election):
+    make_election(voters=3)
+    bump(coordinator.id, email_failures=2, voters_invited=40)
+    db.session.commit()
+
+    stats = rebuild(coordinator.id)
+    assert (stats["active_elections"], stats["voters_invited"], stats["email_failures"]) == (1, 3, 2)
+
+
+def test_rebuild_starts_a_new_row_from_reminder_campaigns(coordinator):
+    election = Election(title="Old", passcode="p", coordinator_id=coordinator.id,
+                        start_time=datetime(2025, 1, 1), end_time=datetime(2025, 1, 2))
+    db.session.add(election)
+    db.session.flush()
+    db.session.add(ReminderCampaign(election_id=election.id, total=5, sent=1, failed=4))
+    db.session.commit()
+
+    stats = rebuild(coordinator.id)
+    assert (stats["closed_elections"], stats["email_failures"]) == (1, 4)
@@ -0,0 +1,83 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from extensions import db
+from models import Token, TokenArchive, Voter
+from tokens import active_token_query, compact_tokens, find_active_token, purge_expired_tokens
+
+
+@pytest.fixture
+def binary_storage(app):
+    app.config["TOKEN_STORAGE"] = "binary"
+
+
+def links(election):
+    voters = Voter.query.filter_by(election_id=election.id).order_by(Voter.id)
+    return [Token.query.filter_by(voter_id=v.id).one().value for v in voters]
+
+
+def test_purge_archives_expired_tokens_without_the_secret(make_election):
+    expired = make_election(voters=5, starts_in=-timedelta(days=20), ends_in=-timedelta(days=10))
+    current = make_election(voters=2)
+
+    # A batch size that doesn't divide the count: the last batch is partial
+    assert purge_expired_tokens(batch_size=2) == 5
+    assert Token.query.filter_by(election_id=expired.id).count() == 0
+    assert Token.query.filter_by(election_id=current.id).count() == 2
+
+    archived = TokenArchive.query.order_by(TokenArchive.id).all()
+    assert [a.election_id for a in archived] == [expired.id] * 5
+    assert all(a.expires_at == expired.end_time for a in archived)
+    assert {"token", "token_bin"}.isdisjoint(TokenArchive.__table__.c.keys())
+
+
+def test_purge_keeps_tokens_within_the_grace_period(app, make_election):
+    make_election(voters=1, starts_in=-timedelta(days=3), ends_in=-timedelta(days=1))
+    assert purge_expired_tokens() == 0  # TOKEN_PURGE_GRACE_DAYS is 7
+    assert purge_expired_tokens(archive=False, older_than=datetime.utcnow()) == 1
+    assert TokenArchive.query.count() == 0
+
+
+def test_links_keep_working_after_compaction(app, make_election):
+    app.config["TOKEN_STORAGE"] = "string"  # issued before switching
+    election = make_election(voters=5)
+    before = links(election)
+    app.config["TOKEN_STORAGE"] = "binary"
+
+    assert compact_tokens(batch_size=2, drop_strings=True) == (5, 5)
+    assert Token.query.filter(Token.token.isnot(None)).count() == 0
+    assert links(election) == before
+    assert [find_active_token(link).voter_id for link in before] == [
+        v.id for v in Voter.query.filter_by(election_id=election.id).order_by(Voter.id)
+    ]
+
+
+def test_mixed_text_and_binary_rows(app, make_election):
+    app.config["TOKEN_STORAGE"] = "string"
+    old = make_election(voters=2)
+    app.config["TOKEN_STORAGE"] = "binary"
+    new = make_election(voters=2)
+    assert Token.query.filter_by(election_id=new.id).filter(Token.token.is_(None)).count() == 2
+
+    # Binary lookups still find rows that only have the text form
+    for link in links(old) + links(new):
+        assert find_active_token(link) is not None
+    # Compacting converts just the text rows and is safe to re-run
+    assert compact_tokens(batch_size=1) == (2, 0)
+    assert compact_tokens(batch_size=1) == (0, 0)
+
+
+def test_active_token_query_rejects_used_expired_and_malformed_links(binary_storage, make_election):
+    link = links(make_election(voters=1))[0]
+    expired = links(make_election(voters=1, starts_in=-timedelta(days=2), ends_in=-timedelta(days=1)))[0]
+
+    assert active_token_query("not-a-uuid", binary_storage=True) is None
+    assert find_active_token(expired) is None
+    assert find_active_token(str(uuid.uuid4())) is None
+
+    token = find_active_token(link)
+    token.is_used = True
+    db.session.commit()
+    assert find_active_token(link) is None
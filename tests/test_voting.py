@@ -0,0 +1,42 @@
+from extensions import db
+from models import Candidate, Token, Vote, Voter
+
+
+def ballot(election):
+    """(voting link token, email) of the election's first voter."""
+    voter = Voter.query.filter_by(election_id=election.id).first()
+    return Token.query.filter_by(voter_id=voter.id).one().value, voter.email
+
+
+def vote(client, token, email, candidate, key="k1"):
+    data = {"email": email, "passcode": "pass", "idempotency_key": key}
+    if candidate is not None:
+        data["candidate"] = candidate
+    return client.post(f"/vote_with_token/{token}", data=data)
+
+
+def test_vote_is_recorded(app, make_election):
+    election = make_election(voters=1)
+    token, email = ballot(election)
+    candidate = Candidate.query.filter_by(election_id=election.id).one()
+
+    assert vote(app.test_client(), token, email, candidate.id).status_code == 302
+    assert Vote.query.one().candidate_id == candidate.id
+    assert db.session.get(Token, Token.query.one().id).is_used
+
+
+def test_candidate_must_be_on_this_ballot(app, make_election):
+    election = make_election(voters=1)
+    other = make_election(title="Other", candidates=("Grace",))
+    foreign = Candidate.query.filter_by(election_id=other.id).one()
+    token, email = ballot(election)
+    client = app.test_client()
+
+    for i, candidate in enumerate((None, "abc", foreign.id)):
+        assert vote(client, token, email, candidate, key=f"k{i}").status_code == 400
+    assert Vote.query.count() == 0
+    assert not Token.query.filter_by(election_id=election.id).one().is_used
+
+    # The rejected submissions released their idempotency keys
+    own = Candidate.query.filter_by(election_id=election.id).one()
+    assert vote(client, token, email, own.id, key="k2").status_code == 302
@@ -0,0 +1,150 @@
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, insert, or_, select, update
+
+from extensions import db
+from models import Token, TokenArchive
+
+
+def _binary_storage():
+    return current_app.config["TOKEN_STORAGE"] == "binary"
+
+
+def new_token_values(election):
+    """
+    Column values for a fresh token: its expiry, plus the UUID as text or
+    as 16 bytes depending on TOKEN_STORAGE. Returns (values, link_token).
+    """
+    value = uuid.uuid4()
+    values = {"election_id": election.id, "expires_at": election.end_time}
+    if _binary_storage():
+        values["token_bin"] = value.bytes
+    else:
+        values["token"] = str(value)
+    return values, str(value)
+
+
+def issue_token(voter, election):
+    """Add a token for `voter` to the session. Returns (Token, link_token)."""
+    values, link_token = new_token_values(election)
+    token = Token(voter_id=voter.id, **values)
+    db.session.add(token)
+    return token, link_token
+
+
+def active_token_query(link_token, binary_storage):
+    """SELECT for the unused, unexpired Token behind a voting link, or None if malformed."""
+    if binary_storage:
+        try:
+            token_bin = uuid.UUID(link_token).bytes
+        except ValueError:
+            return None
+        # Rows created before compaction still only have the text form
+        match = or_(Token.token_bin == token_bin, Token.token == link_token)
+    else:
+        match = Token.token == link_token
+
+    return select(Token).where(
+        match,
+        Token.is_used.is_(False),
+        or_(Token.expires_at.is_(None), Token.expires_at > datetime.utcnow())
+    ).limit(1)
+
+
+def find_active_token(link_token):
+    """The unused, unexpired Token for a voting link, or None."""
+    stmt = active_token_query(link_token, _binary_storage())
+    if stmt is None:
+        return None
+    return db.session.execute(stmt).scalars().first()
+
+
+def purge_expired_tokens(batch_size=None, archive=True, older_than=None):
+    """
+    Remove tokens that expired more than TOKEN_PURGE_GRACE_DAYS ago, a batch
+    at a time with a commit per batch, so the table is never locked for
+    long. With `archive`, rows are first copied (minus the secret) into
+    token_archive. Returns the number of tokens removed.
+    """
+    batch_size = batch_size or current_app.config["TOKEN_PURGE_BATCH_SIZE"]
+    if older_than is None:
+        older_than = datetime.utcnow() - timedelta(days=current_app.config["TOKEN_PURGE_GRACE_DAYS"])
+
+    removed = 0
+    while True:
+        ids = db.session.execute(
+            select(Token.id)
+            .where(Token.expires_at < older_than)
+            .order_by(Token.id)
+            .limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            break
+
+        if archive:
+            db.session.execute(
+                insert(TokenArchive).from_select(
+                    ["id", "election_id", "voter_id", "is_used", "created_at", "expires_at"],
+                    select(
+                        Token.id, Token.election_id, Token.voter_id,
+                        Token.is_used, Token.created_at, Token.expires_at
+                    ).where(Token.id.in_(ids))
+                )
+            )
+        db.session.execute(delete(Token).where(Token.id.in_(ids)))
+        db.session.commit()
+        removed += len(ids)
+
+    return removed
+
+
+def compact_tokens(batch_size=None, drop_strings=False, pause=0):
+    """
+    Migrate existing tokens to the 16-byte form: fill token_bin from the
+    text column in batches, and with `drop_strings` clear the text column
+    afterwards. Returns (converted, cleared).
+    """
+    batch_size = batch_size or current_app.config["TOKEN_PURGE_BATCH_SIZE"]
+
+    converted = 0
+    last_id = 0
+    while True:
+        rows = db.session.execute(
+            select(Token.id, Token.token)
+            .where(Token.id > last_id, Token.token_bin.is_(None), Token.token.isnot(None))
+            .order_by(Token.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        db.session.execute(
+            update(Token),
+            [{"id": row.id, "token_bin": uuid.UUID(row.token).bytes} for row in rows]
+        )
+        db.session.commit()
+        converted += len(rows)
+        last_id = rows[-1].id
+        if pause:
+            time.sleep(pause)
+
+    cleared = 0
+    if drop_strings:
+        while True:
+            ids = db.session.execute(
+                select(Token.id)
+                .where(Token.token_bin.isnot(None), Token.token.isnot(None))
+                .order_by(Token.id)
+                .limit(batch_size)
+            ).scalars().all()
+            if not ids:
+                break
+            db.session.execute(update(Token).where(Token.id.in_(ids)).values(token=None))
+            db.session.commit()
+            cleared += len(ids)
+            if pause:
+                time.sleep(pause)
+
+    return converted, cleared